@@ -0,0 +1,151 @@
+"""Offline benchmark that measures how the decisions of bots compare with the
+games recorded by competitions, see `records`.  Every recorded game is
+replayed with the candidate bots in each seat, and their decisions are
+compared with what was actually played, separately for the seats that went
+on to win or lose, and in hindsight given who the spies were.
+
+This takes seconds rather than running thousands of games, so it's a quick
+check that changes to a bot behave as intended.
+"""
+
+from __future__ import print_function
+
+import sys
+import argparse
+
+import records
+from replay import ReplayGame, SELECT, VOTE, SABOTAGE
+from competition import CompetitionPool, COMPETITORS, getCompetitors, timer
+from util import Variable
+
+
+PHASES = [SELECT, VOTE, SABOTAGE]
+
+
+class AgreementStatistics(object):
+    """How often a bot's decisions in one phase agree with those recorded."""
+
+    def __init__(self):
+        self.played = Variable()        # Same decision as the recorded player.
+        self.winners = Variable()       # Same, for seats on the winning side.
+        self.losers = Variable()        # Same, for seats on the losing side.
+        self.hindsight = Variable()     # Right team or vote, knowing the spies.
+
+    def __iadd__(self, other):
+        for k, v in self.__dict__.items():
+            v += other.__dict__[k]
+        return self
+
+
+class AgreementGame(ReplayGame):
+    """Replay that collects statistics about the decisions of the bot."""
+
+    statistics = None
+    count = 0
+
+    def onDecision(self, phase, chosen, played):
+        self.count += 1
+        s = self.statistics[phase]
+        if played is not None:
+            same = int(chosen == played)
+            s.played.sample(same)
+            if self.recorded != self.bot.spy:
+                s.winners.sample(same)
+            else:
+                s.losers.sample(same)
+
+        if not self.known or phase == SABOTAGE:
+            return
+        # Resistance should only pick and approve teams without spies, and
+        # spies the opposite; for sabotages there's no such obvious answer.
+        team = chosen if phase == SELECT else set([p.index for p in self.state.team])
+        clean = not any([p.index in team for p in self.spies])
+        approved = chosen if phase == VOTE else True
+        s.hindsight.sample(int(approved == (clean != self.bot.spy)))
+
+
+def evaluate(task):
+    """Replay a range of games from an archive with every candidate, given by
+    index into the preloaded competitors, in all the seats or those played by
+    the named bot.  Returns the statistics and number of decisions."""
+    filename, ids, name, start, stop = task
+    statistics = dict((i, dict((p, AgreementStatistics()) for p in PHASES)) for i in ids)
+    decisions = 0
+
+    names, games = records.read(filename, start, stop)
+    for r in games:
+        for seat in range(5):
+            if name is not None and names[r.seats[seat]] != name:
+                continue
+            for i in ids:
+                game = AgreementGame.fromRecord(COMPETITORS[i], seat, names, r)
+                game.statistics = statistics[i]
+                game.run()
+                decisions += game.count
+    return statistics, decisions
+
+
+class AgreementRunner(object):
+
+    def __init__(self, filename, candidates, name = None, chunk = 250, pool = None, quiet = False):
+        self.filename = filename
+        self.candidates = candidates
+        self.name = name
+        self.chunk = chunk
+        self.pool = pool
+        self.quiet = quiet
+
+        self.statistics = dict((bot.__name__, dict((p, AgreementStatistics()) for p in PHASES)) for bot in candidates)
+
+    def tasks(self, ids):
+        total = records.count(self.filename)
+        for start in range(0, total, self.chunk):
+            yield (self.filename, ids, self.name, start, min(start + self.chunk, total))
+
+    def main(self):
+        pool = self.pool or CompetitionPool(self.candidates)
+        ids = [pool.index(bot) for bot in self.candidates]
+        start = timer()
+        decisions = 0
+        try:
+            for statistics, count in pool.dispatch(evaluate, self.tasks(ids)):
+                for i, phases in statistics.items():
+                    for p, s in phases.items():
+                        self.statistics[pool.competitors[i].__name__][p] += s
+                decisions += count
+        finally:
+            if pool is not self.pool:
+                pool.terminate()
+
+        if not self.quiet:
+            elapsed = timer() - start
+            print("Replayed %i decisions in %0.1fs." % (decisions, elapsed), file=sys.stderr)
+
+    def echo(self, *args):
+        print(*args)
+
+    def show(self):
+        self.echo('{0:<26s}'.format("AGREEMENT"), "played   winners    losers  hindsight")
+        for bot in self.candidates:
+            for p in PHASES:
+                s = self.statistics[bot.__name__][p]
+                self.echo(" ", '{0:<16s}'.format(bot.__name__), '{0:<8s}'.format(p),
+                          s.played, "   ", s.winners, "   ", s.losers, "   ", s.hindsight)
+        self.echo("")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Compare the decisions of bots with recorded games.")
+    parser.add_argument('archive', type=str,
+                help = "File of game records, as stored by competition.py --record.")
+    parser.add_argument('bots', nargs='+',
+                help = "Candidate bots, as modules or module.Class names.")
+    parser.add_argument('--name', type=str, default=None,
+                help = "Only replay the seats played by this bot in the records.")
+    parser.add_argument('--chunk', type=int, default=250,
+                help = "Number of games replayed by each worker task.")
+    args = parser.parse_args()
+
+    runner = AgreementRunner(args.archive, getCompetitors(args.bots), name = args.name, chunk = args.chunk)
+    runner.main()
+    runner.show()
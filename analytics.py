@@ -0,0 +1,207 @@
+"""Correlations between the behavior of bots and the outcome of their games,
+computed from the records of competitions, see `archive`.  This requires
+NumPy, like the archive itself.
+
+Every seat in every attempt of a game is a row of features, which are built
+as flat arrays from the mapped records a chunk of games at a time:
+
+    bot         Index of the bot in the archive.
+    seat        Seat of the bot in the game.
+    spy         1 if the bot played as spy.
+    win         1 if the bot's side won the game.
+    mission     Mission number, 1..5.
+    tries       Attempt number, 1..5.
+    leader      1 if the bot selected the team.
+    selected    1 if the bot was on the team.
+    spies       Number of spies on the team.
+    vote        1 if the bot voted for the team.
+    approved    1 if the team was voted through.
+    sabotages   Number of sabotages, if the mission went ahead.
+
+The experiments from tools/EXPERIMENTS.md are then accumulated per bot with
+vectorized reductions, so arbitrarily large archives are processed without
+loops over individual decisions.
+"""
+
+from __future__ import print_function
+
+import sys
+import argparse
+import collections
+
+import numpy
+
+import records
+from archive import GameArchive
+from competition import timer
+from util import Variable
+
+
+POPCOUNT = numpy.array([bin(i).count('1') for i in range(32)], dtype=numpy.uint8)
+
+FEATURES = ['bot', 'seat', 'spy', 'win', 'mission', 'tries', 'leader', 'selected', 'spies',
+            'vote', 'approved', 'sabotages']
+
+
+def decisions(data):
+    """Features of every seat in every attempt of an array of records, as a
+    dictionary of flat arrays with one entry per decision."""
+    valid = numpy.arange(records.MAX_ATTEMPTS) < data['attempts'][:,numpy.newaxis].astype(numpy.intp)
+    games, attempts = numpy.nonzero(valid)
+    games, attempts = numpy.repeat(games, 5), numpy.repeat(attempts, 5)
+    seat = numpy.tile(numpy.arange(5, dtype=numpy.uint8), len(games) // 5)
+
+    turns = data['turns'][games, attempts]
+    teams = data['teams'][games, attempts]
+    votes = data['votes'][games, attempts]
+    spies = data['spies'][games]
+
+    spy = (spies >> seat) & 1
+    team = teams & 31
+    approved = POPCOUNT[votes & 31] > 2
+    return {
+        'bot': data['seats'][games, seat],
+        'seat': seat,
+        'spy': spy,
+        'win': spy ^ data['won'][games],
+        'mission': turns >> 3,
+        'tries': turns & 7,
+        'leader': ((teams >> 5) == seat).astype(numpy.uint8),
+        'selected': (team >> seat) & 1,
+        'spies': POPCOUNT[team & spies],
+        'vote': (votes >> seat) & 1,
+        'approved': approved.astype(numpy.uint8),
+        'sabotages': numpy.where(approved, votes >> 5, 0).astype(numpy.uint8),
+    }
+
+
+class Rates(object):
+    """Win rates of each bot conditional on a small integer key."""
+
+    def __init__(self, bots, size):
+        self.size = size
+        self.wins = numpy.zeros((bots, size))
+        self.counts = numpy.zeros((bots, size))
+
+    def add(self, bot, key, win):
+        index = bot.astype(numpy.intp) * self.size + key
+        length = self.wins.size
+        self.wins += numpy.bincount(index, weights=win, minlength=length).reshape(self.wins.shape)
+        self.counts += numpy.bincount(index, minlength=length).reshape(self.counts.shape)
+
+    def get(self, bot, key):
+        return Variable(self.wins[bot, key], int(self.counts[bot, key]))
+
+
+class Correlation(object):
+    """Pearson correlation between a feature and winning, for each bot and
+    role, accumulated as sums so chunks can be added one at a time."""
+
+    def __init__(self, bots):
+        self.sums = numpy.zeros((6, bots, 2))
+
+    def add(self, bot, spy, x, y):
+        index = bot.astype(numpy.intp) * 2 + spy
+        x, y = x.astype(numpy.float64), y.astype(numpy.float64)
+        length = self.sums[0].size
+        for i, w in enumerate([None, x, y, x * x, y * y, x * y]):
+            self.sums[i] += numpy.bincount(index, weights=w, minlength=length).reshape(self.sums[i].shape)
+
+    def get(self, bot, spy):
+        n, sx, sy, sxx, syy, sxy = self.sums[:, bot, spy]
+        variance = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        if n < 2 or variance <= 0.0:
+            return float('nan'), int(n)
+        return (n * sxy - sx * sy) / numpy.sqrt(variance), int(n)
+
+
+# Win rates conditional on a behavior, for rows selected by a mask, with the
+# key computed from the features.  Keys are offset by 2 for spies, so both
+# roles are measured separately.
+RATES = [
+    ('selectSelf', "Should you select yourself or not?",
+        lambda d: d['leader'] == 1, lambda d: d['spy'] * 2 + d['selected']),
+    ('voteOwn', "Should you vote up your own missions?",
+        lambda d: d['leader'] == 1, lambda d: d['spy'] * 2 + d['vote']),
+    ('selectSpies', "SPY: Should you select other spies or not?",
+        lambda d: (d['leader'] == 1) & (d['spy'] == 1), lambda d: 2 + (d['spies'] > d['selected'])),
+    ('voteSpies', "SPY: Should you vote for spies or not?",
+        lambda d: (d['spy'] == 1) & (d['spies'] > 0), lambda d: 2 + d['vote']),
+]
+
+# Correlations between a behavior or event and winning, for the rows selected
+# by the mask, or all of them.
+CORRELATIONS = [
+    ('votedUp', "Correlation between being voted up and winning.",
+        lambda d: d['leader'] == 1, lambda d: d['approved']),
+    ('selected', "Correlation between being selected and winning.",
+        None, lambda d: d['selected']),
+]
+
+
+class BehaviorAnalytics(object):
+    """Accumulates the experiments over an archive of game records."""
+
+    def __init__(self, filename, chunk = 100000, quiet = False):
+        self.archive = GameArchive(filename)
+        self.chunk = chunk
+        self.quiet = quiet
+        self.decisions = 0
+
+        bots = len(self.archive.names)
+        self.rates = collections.OrderedDict((name, Rates(bots, 4)) for name, _, _, _ in RATES)
+        self.correlations = collections.OrderedDict((name, Correlation(bots)) for name, _, _, _ in CORRELATIONS)
+
+    def add(self, d):
+        """Accumulate the experiments for a chunk of decisions."""
+        self.decisions += len(d['bot'])
+        for name, _, mask, key in RATES:
+            m = mask(d)
+            self.rates[name].add(d['bot'][m], key(d)[m], d['win'][m])
+        for name, _, mask, feature in CORRELATIONS:
+            m = mask(d) if mask else slice(None)
+            self.correlations[name].add(d['bot'][m], d['spy'][m], feature(d)[m], d['win'][m])
+
+    def main(self):
+        start = timer()
+        for i in range(0, len(self.archive), self.chunk):
+            self.add(decisions(self.archive.records[i:i+self.chunk]))
+        if not self.quiet:
+            elapsed = timer() - start
+            print("Analyzed %i decisions in %0.1fs." % (self.decisions, elapsed), file=sys.stderr)
+
+    def echo(self, *args):
+        print(*args)
+
+    def show(self, names = None):
+        for name in names or self.archive.names:
+            b = self.archive.names.index(name)
+            self.echo(name.upper())
+            for key, description, _, _ in RATES:
+                r = self.rates[key]
+                self.echo("  " + description)
+                for role, offset in [('RES', 0), ('SPY', 2)]:
+                    no, yes = r.get(b, offset), r.get(b, offset + 1)
+                    if no.samples or yes.samples:
+                        self.echo("    %s  yes %s (n=%i)   no %s (n=%i)" % (role, yes, yes.samples, no, no.samples))
+            for key, description, _, _ in CORRELATIONS:
+                self.echo("  " + description)
+                for role, spy in [('RES', 0), ('SPY', 1)]:
+                    value, n = self.correlations[key].get(b, spy)
+                    self.echo("    %s  %+0.3f (n=%i)" % (role, value, n))
+            self.echo("")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Correlate the behavior of bots with winning, from game records.")
+    parser.add_argument('archive', type=str,
+                help = "File of game records, as stored by competition.py --record.")
+    parser.add_argument('bots', nargs='*',
+                help = "Names of the bots to show, or all of those in the records.")
+    parser.add_argument('--chunk', type=int, default=100000,
+                help = "Number of games processed at a time.")
+    args = parser.parse_args()
+
+    analytics = BehaviorAnalytics(args.archive, chunk = args.chunk)
+    analytics.main()
+    analytics.show(args.bots)
@@ -0,0 +1,176 @@
+"""Memory-mapped access to the game records stored by competitions, with a
+sidecar index to find the games of each bot quickly.  This requires NumPy.
+Both files are mapped rather than read, but queries copy the records they
+select, so large selections are best processed in chunks of `entries()`.
+
+The index is stored next to the archive with the extension '.idx', and is
+rebuilt automatically if the archive changed since it was built, as checked
+with a fingerprint of its size, modification time, first and last records.  For
+each bot it lists the numbers of the records it played, with a byte that
+stores the seat, the role and the result for that bot:
+
+    seat | spy << 3 | win << 4
+"""
+
+import os
+import struct
+import hashlib
+
+import numpy
+
+import records
+
+
+INDEX_MAGIC = b'RSTI'
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct('<4sBxxxQI20s')
+
+SPY = 1 << 3
+WIN = 1 << 4
+
+
+def recordType(announcements):
+    """NumPy equivalent of the binary record layout, see `records`."""
+    fields = [('seed', '<u8'), ('number', '<u4'), ('seats', 'u1', (5,)),
+              ('spies', 'u1'), ('won', 'u1'), ('attempts', 'u1'),
+              ('turns', 'u1', (records.MAX_ATTEMPTS,)),
+              ('teams', 'u1', (records.MAX_ATTEMPTS,)),
+              ('votes', 'u1', (records.MAX_ATTEMPTS,)), ('retry', 'u1')]
+    if announcements:
+        fields.append(('announcements', 'u1', (records.MAX_ATTEMPTS, 5, 5)))
+    dtype = numpy.dtype(fields)
+    assert dtype.itemsize == records.recordSize(announcements)
+    return dtype
+
+
+def buildIndex(data, bots):
+    """Compute the index entries for an array of records, returning the
+    record numbers and flags sorted by bot, and the number of entries for
+    each of the bots."""
+    count = len(data)
+    seats = data['seats'].astype(numpy.intp).ravel()
+    numbers = numpy.repeat(numpy.arange(count, dtype=numpy.uint32), 5)
+    seat = numpy.tile(numpy.arange(5, dtype=numpy.uint8), count)
+
+    spy = (numpy.repeat(data['spies'], 5) >> seat) & 1
+    win = spy ^ numpy.repeat(data['won'], 5)
+    flags = (seat | (spy << 3) | (win << 4)).astype(numpy.uint8)
+
+    order = numpy.argsort(seats, kind='mergesort')
+    return numbers[order], flags[order], numpy.bincount(seats, minlength=bots)
+
+
+def fingerprint(filename, data):
+    """Digest identifying the contents of an archive, without reading it all."""
+    stat = os.stat(filename)
+    digest = hashlib.sha1(struct.pack('<Qd', stat.st_size, stat.st_mtime))
+    if len(data):
+        digest.update(data[:1].tobytes())
+        digest.update(data[-1:].tobytes())
+    return digest.digest()
+
+
+def writeIndex(filename, count, digest, games, flags, counts):
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, count, len(counts), digest))
+        f.write(counts.astype('<u8').tobytes())
+        f.write(games.astype('<u4').tobytes())
+        f.write(flags.astype('u1').tobytes())
+    getattr(os, 'replace', os.rename)(filename + '.tmp', filename)
+
+
+class GameArchive(object):
+    """Read-only view of a file of game records, which can be queried for the
+    games of each bot by name.  The `records` member is a structured array
+    with the fields of the binary layout, mapped from disk."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self.names, self.announcements, offset = records.readHeader(f)
+        self.dtype = recordType(self.announcements)
+
+        count = (os.path.getsize(filename) - offset) // self.dtype.itemsize
+        if count:
+            self.records = numpy.memmap(filename, dtype=self.dtype, mode='r', offset=offset, shape=(count,))
+        else:
+            self.records = numpy.zeros(0, dtype=self.dtype)
+        self._loadIndex()
+
+    def __len__(self):
+        return len(self.records)
+
+    def _loadIndex(self):
+        """Map the sidecar index, rebuilding it if it's missing or was built
+        for other contents of the archive."""
+        filename = self.filename + '.idx'
+        digest = fingerprint(self.filename, self.records)
+        header = None
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                data = f.read(INDEX_HEADER.size)
+            if len(data) == INDEX_HEADER.size:
+                header = INDEX_HEADER.unpack(data)
+        if header != (INDEX_MAGIC, INDEX_VERSION, len(self), len(self.names), digest):
+            writeIndex(filename, len(self), digest, *buildIndex(self.records, len(self.names)))
+
+        with open(filename, 'rb') as f:
+            f.seek(INDEX_HEADER.size)
+            self.counts = numpy.frombuffer(f.read(8 * len(self.names)), dtype='<u8').astype(numpy.intp)
+        self.starts = numpy.concatenate([[0], numpy.cumsum(self.counts)]).astype(numpy.intp)
+
+        total = int(self.starts[-1])
+        offset = INDEX_HEADER.size + 8 * len(self.names)
+        if total:
+            self.games = numpy.memmap(filename, dtype='<u4', mode='r', offset=offset, shape=(total,))
+            self.flags = numpy.memmap(filename, dtype='u1', mode='r', offset=offset + 4 * total, shape=(total,))
+        else:
+            self.games = numpy.zeros(0, dtype='<u4')
+            self.flags = numpy.zeros(0, dtype='u1')
+
+    def entries(self, name, spy = None, won = None):
+        """Record numbers of the games played by the named bot, optionally
+        only as spy or resistance and only games won or lost, along with the
+        seat of the bot in each of those games."""
+        b = self.names.index(name)
+        games = self.games[self.starts[b]:self.starts[b+1]]
+        flags = self.flags[self.starts[b]:self.starts[b+1]]
+        if spy is not None or won is not None:
+            selected = numpy.ones(len(flags), dtype=bool)
+            if spy is not None:
+                selected &= ((flags & SPY) != 0) == bool(spy)
+            if won is not None:
+                selected &= ((flags & WIN) != 0) == bool(won)
+            games, flags = games[selected], flags[selected]
+        return games, (flags & 7).astype(numpy.intp)
+
+    def query(self, name, spy = None, won = None):
+        """Records of the games played by the named bot with the filters as
+        above, and the seat of the bot in each of them.  The records are a
+        copy of those selected from the mapped file, not a view on it."""
+        games, seats = self.entries(name, spy, won)
+        return self.records[games], seats
+
+    def selection(self, name, mission, tries, spy = None):
+        """How often the named bot was picked for the given mission and try,
+        returned as the number of times it was picked, and the number of
+        those attempts that happened in its games."""
+        data, seats = self.query(name, spy)
+        current = data['turns'] == (mission << 3 | tries)
+        picked = (data['teams'] & 31) & (1 << seats)[:,numpy.newaxis] != 0
+        return int((current & picked).sum()), int(current.sum())
+
+    def winrate(self, name, spy = None):
+        """Fraction of games won by the named bot, and the number of games."""
+        b = self.names.index(name)
+        flags = self.flags[self.starts[b]:self.starts[b+1]]
+        if spy is not None:
+            flags = flags[((flags & SPY) != 0) == bool(spy)]
+        if not len(flags):
+            return 0.0, 0
+        return float(((flags & WIN) != 0).mean()), len(flags)
+
+
+def update(filename):
+    """Bring the sidecar index of an archive up-to-date after writing it."""
+    GameArchive(filename)
@@ -1,15 +1,13 @@
 import random
-import inspect
-import itertools
 
 from player import Bot
-from intermediate import Simpleton
+from bots.intermediates import Simpleton
 
 
 __all__ = ['RandomCheater', 'LogicalCheater']
 
 
-# RES_CHEAT_RATIO = 0.7
+RES_CHEAT_RATIO = 0.7
 RES_CORRECT_DOWNVOTE = 0.7
 RES_CORRECT_UPVOTE = 0.7
 RES_CORRECT_SELECTION = 0.7
@@ -17,14 +15,12 @@ RES_CORRECT_SELECTION = 0.7
 SPY_CHEAT_RATIO = 0.7
 
 
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
-
-
 class RandomCheater(Bot):
-    """An AI that can hack the current game implementation and cheat
-    randomly a specified percentage of the time."""
+    """An AI that is told the true roles by the game's oracle, and cheats
+    randomly a specified percentage of the time.  It's only meant for
+    measuring other bots, in games played with the oracle enabled."""
+
+    ORACLE = True
 
     @classmethod
     def cheat_SetRate(cls, res, spy):
@@ -34,27 +30,14 @@ class RandomCheater(Bot):
         SPY_CHEAT_RATIO = spy
 
     def cheat_GetSpies(self):
-        """Grab the game state from the stack, and lookup the spies using the
-        inspection module.  This code was adapted from Tom Schaul's tests."""
-        spies = []
-        f = inspect.stack()[2]
-        for game in [v for v in f[0].f_locals.values() if hasattr(v, 'bots')]:
-            for b in game.bots:
-                spies.extend([p for p in self.players if b == p and b.spy])
-            break
-        del f
-        return set(spies)
+        """The true spies, as revealed by the game's oracle."""
+        assert self.oracle is not None, "%s needs the game's oracle, e.g. competition.py --oracle." % (self.name)
+        return self.oracle
 
     def onGameRevealed(self, players, spies):
         self.players = players
         self.spies = spies or self.cheat_GetSpies()
 
-    def getSpies(self, config):
-        return set([player for player, spy in zip(self.others(), config) if spy])
-
-    def getResistance(self, config):
-        return [player for player, spy in zip(self.others(), config) if not spy]
-
     def correct(self):
         return random.random() <= (SPY_CHEAT_RATIO if self.spy else RES_CHEAT_RATIO)
 
@@ -96,13 +79,16 @@ class RandomCheater(Bot):
 
 class LogicalCheater(Simpleton):
 
-    cheat           = RandomCheater.__dict__['correct']
+    ORACLE          = True
+
+    correct         = RandomCheater.__dict__['correct']
     cheat_Select    = RandomCheater.__dict__['cheat_Select']
     cheat_Vote      = RandomCheater.__dict__['cheat_Vote']
     cheat_GetSpies  = RandomCheater.__dict__['cheat_GetSpies']
 
     def onGameRevealed(self, players, spies):
         super(LogicalCheater, self).onGameRevealed(players, spies)
+        self.players = players
         self.spies = spies or self.cheat_GetSpies()
 
     def _vote(self, team):
@@ -111,7 +97,9 @@ class LogicalCheater(Simpleton):
         return RandomCheater.__dict__['vote'](self, team) 
 
     def select(self, players, count):
-        while True:
+        # The logical reasoning may rule out every team, e.g. for spies once
+        # their own sabotages are accounted for, so only try for a while.
+        for _ in range(100):
             team = RandomCheater.__dict__['select'](self, players, count)
             if self._acceptable(team):
                 break
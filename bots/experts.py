@@ -1,12 +1,7 @@
 import random
-import itertools
 
 from player import Bot
-
-
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
+import configurations as configs
 
 
 class Suspicious(Bot):
@@ -55,8 +50,7 @@ class Suspicious(Bot):
         return score, factors
 
     def oracle_sabotages(self, config, sabotaged):
-        spies = [s for s in self.game.team if s in self.getSpies(config)]
-        score = max(0, sabotaged - len(spies)) * 100.0
+        score = max(0, sabotaged - configs.POPCOUNT[config & self.game.teamMask]) * 100.0
         if score > 0.0:
             return score, [(score, "%s participated in a mission that had %i sabotages." % (self.game.team, sabotaged))]
         else:
@@ -87,9 +81,9 @@ class Suspicious(Bot):
         self.spies = spies
 
         # Count the number of times each configuration was apparently invalidated.
-        self.invalidations = {k: 0.0 for k in permutations([True, True, False, False])}
+        self.invalidations = {k: 0.0 for k in configs.configurations(len(players), 2, exclude = self.index)}
         # This is used to help justify decisions in hybrid human/bot matches.
-        self.factors = {k: [] for k in permutations([True, True, False, False])}
+        self.factors = {k: [] for k in self.invalidations}
 
     def likeliest(self):
         ranked = sorted(self.invalidations.keys(), key = lambda c: self.invalidations[c])
@@ -113,11 +107,7 @@ class Suspicious(Bot):
             return advice
 
         # Count the scores of configurations where no spies are selected. 
-        scores, matches = [], []
-        for config in self.invalidations:
-            if len([s for s in team if s in self.getSpies(config)]) == 0:
-                scores.append(self.invalidations[config])
-                matches.append(config)
+        scores = [self.invalidations[config] for config in configs.clean(self.invalidations, team)]
         if not scores:
             return False
 
@@ -132,14 +122,10 @@ class Suspicious(Bot):
             self.factors[config].extend(factors)
 
     def getSpies(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return set([player for player, spy in zip(self.others(), config) if spy])
+        return set(configs.spiesIn(config, self.others()))
 
     def getResistance(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return set([player for player, spy in zip(self.others(), config) if not spy])
+        return set(configs.resistanceIn(config, self.others()))
 
     def onMissionComplete(self, sabotaged):
         for config in self.invalidations:
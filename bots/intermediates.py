@@ -1,12 +1,7 @@
 import random
-import itertools
 
 from player import Bot
-
-
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
+import configurations as configs
 
 
 class Simpleton(Bot):
@@ -15,25 +10,13 @@ class Simpleton(Bot):
 
     def onGameRevealed(self, players, spies):
         self.spies = spies
-        self.configurations = permutations([True, True, False, False])
+        self.configurations = configs.configurations(len(players), 2, exclude = self.index)
 
     def getSpies(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return [player for player, spy in zip(self.others(), config) if spy]
+        return configs.spiesIn(config, self.others())
 
     def getResistance(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return [player for player, spy in zip(self.others(), config) if not spy]
-
-    def _validateSpies(self, config, team, sabotaged):
-        spies = [s for s in team if s in self.getSpies(config)]
-        return len(spies) >= sabotaged
-
-    def _validateNoSpies(self, config, team):
-        spies = [s for s in team if s in self.getSpies(config)]
-        return len(spies) == 0
+        return configs.resistanceIn(config, self.others())
 
     def select(self, players, count):
         if self.configurations:
@@ -53,8 +36,7 @@ class Simpleton(Bot):
         
     def _acceptable(self, team):
         """Determine if this team is an acceptable one to vote for..."""
-        current = [c for c in self.configurations if self._validateNoSpies(c, team)]
-        return bool(len(current) > 0)
+        return bool(configs.clean(self.configurations, team))
 
     def vote(self, team):
         if self.game.tries == 5:
@@ -74,11 +56,7 @@ class Simpleton(Bot):
         return True
 
     def onMissionComplete(self, sabotaged):
-        before = len(self.configurations)
-        self.configurations = [c for c in self.configurations if self._validateSpies(c, self.game.team, sabotaged)]
-        after = len(self.configurations)
-        # self.log.debug("%s: Filtered out %i configurations, %i left." % ("SPY" if self.spy else "RST", after - before, after))
-        # self.log.debug("%r" % [self.getSpies(c) for c in self.configurations])
+        self.configurations = configs.consistent(self.configurations, self.game.teamMask, sabotaged)
 
     def sabotage(self):
         return True
@@ -106,9 +84,9 @@ class Bounder(Simpleton):
 
         # The set of possible assignments around the table, for:
         #   - PESSIMISTIC: All teams except those 100% proven to be spies.
-        self.pessimistic = permutations([True, True, False, False])
+        self.pessimistic = configs.configurations(len(players), 2, exclude = self.index)
         #   - OPTIMISTIC: The teams we don't suspect to be spies without guarantees.
-        self.optimistic = permutations([True, True, False, False])
+        self.optimistic = configs.configurations(len(players), 2, exclude = self.index)
 
     def select(self, players, count):
         if self.optimistic:
@@ -118,18 +96,10 @@ class Bounder(Simpleton):
             config = random.choice(self.pessimistic)
         return [self] + random.sample(self.getResistance(config), count-1)
 
-    def _validate(self, config, team, sabotaged, optimistic):
-        spies = [s for s in team if s in self.getSpies(config)]
-        if optimistic:
-            return len(spies) == sabotaged
-        else:
-            return len(spies) >= sabotaged
-
     def vote(self, team): 
         # Determine if this is an acceptable thing to vote for...
         def acceptable(configurations, optimistic):
-            current = [c for c in configurations if self._validate(c, team, 0, optimistic)]
-            return bool(len(current) > 0)
+            return bool(configs.consistent(configurations, team, 0, optimistic))
 
         # Try our best-case options first, otherwise fall back...
         if self.optimistic:
@@ -143,8 +113,8 @@ class Bounder(Simpleton):
         if self.spy:
             return
 
-        self.optimistic = [c for c in self.optimistic if self._validate(c, self.game.team, sabotaged, True)]
-        self.pessimistic = [c for c in self.pessimistic if self._validate(c, self.game.team, sabotaged, False)]
+        self.optimistic = configs.consistent(self.optimistic, self.game.teamMask, sabotaged, True)
+        self.pessimistic = configs.consistent(self.pessimistic, self.game.teamMask, sabotaged, False)
 
     def sabotage(self):
         return True
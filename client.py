@@ -4,7 +4,7 @@ from twisted.internet import reactor, protocol
 
 from competition import getCompetitors
 from player import Player
-from game import State
+from game import State, bitmask
 
 
 class ResistanceLogger(logging.Handler):
@@ -40,6 +40,7 @@ class ResistanceClient(object):
         self.protocol = protocol
         self.constructor = constructor
         self.bots = {}
+        self.spies = {}
 
         self.channel = None
         self.game = None
@@ -84,7 +85,8 @@ class ResistanceClient(object):
         if spies:
             for s in spies.split(' ')[1:]:
                 saboteurs.add(self.makePlayer(s.rstrip(',')))
-            bot.game.spies = saboteurs
+        self.spies[self.channel] = saboteurs
+        bot.spiesMask = bitmask(saboteurs)
 
         bot.onGameRevealed(participants, saboteurs)
 
@@ -156,11 +158,12 @@ class ResistanceClient(object):
         bot = self.getBot()
 
         w = bool(result.split(' ')[1] == 'Yes')
-        s = self.makeTeam(spies) if spies else bot.game.spies
+        s = self.makeTeam(spies) if spies else self.spies[self.channel]
 
         bot.onGameComplete(w, s)
         self.protocol.part(self.channel)
         del self.bots[self.channel]
+        del self.spies[self.channel]
 
     def process_QUERY(self, *args):
         bot = self.getBot()
@@ -4,16 +4,27 @@ from __future__ import print_function
 
 import multiprocessing
 import collections
+import pickle
+import array
 import itertools
 import importlib
 import random
+import signal
+import argparse
 import math
+import time
 import sys
 import os
 
 from player import Bot
 from game import Game
-from util import Variable
+from util import Variable, Latency
+from rating import RatingEngine
+from records import GameRecorder, RecordWriter
+
+
+# High resolution clock for measuring how long bots take to respond.
+timer = getattr(time, 'perf_counter', time.time)
 
 
 class CompetitionStatistics:
@@ -43,11 +54,156 @@ class CompetitionStatistics:
         return self
 
 
+class CompetitionLatency(object):
+    """Durations of each type of bot API call, for a single bot."""
+
+    def __init__(self):
+        self.calls = collections.defaultdict(Latency)
+
+    def total(self):
+        return sum([l.total for l in self.calls.values()])
+
+    def __iadd__(self, other):
+        for k, v in other.calls.items():
+            self.calls[k] += v
+        return self
+
+
+# Bot API functions that are measured when timing a competition.
+TIMED_CALLS = ['onGameRevealed', 'onMissionAttempt', 'select', 'onTeamSelected', 'vote', 'onVoteComplete',
+               'sabotage', 'onMissionComplete', 'onMissionFailed', 'announce', 'onAnnouncement', 'onGameComplete']
+
+
+def timed(function, latency):
+    """Wrap a bot API function so the duration of each call is sampled."""
+    def call(*args):
+        start = timer()
+        try:
+            return function(*args)
+        finally:
+            latency.sample(timer() - start)
+    return call
+
+
+class PairwiseStatistics(object):
+    """Head-to-head counters for every pair of bots A and B seated in the same
+    game, split by whether both are spies, both resistance, or opposed.  For
+    each pair this counts the games, wins of A, teams selected by A and how
+    many of those included B.  The counters are indexed by A * N + B, and
+    are dense N*N arrays in the runner.  Those of the workers are sparse, as
+    a game only involves 20 pairs, so results are small and quick to merge."""
+
+    RELATIONS = ['spies', 'resistance', 'opposed']
+    COUNTERS = ['games', 'wins', 'leads', 'picks']
+
+    def __init__(self, names, sparse = False):
+        self.names = list(names)
+        size = len(self.names) ** 2
+        if sparse:
+            counter = lambda: collections.defaultdict(int)
+        else:
+            counter = lambda: array.array('l', [0]) * size
+        self.counters = dict(((r, c), counter()) for r in self.RELATIONS for c in self.COUNTERS)
+
+    def add(self, game, ids):
+        """Accumulate a finished game, given the ids of the seated bots."""
+        n = len(self.names)
+        for a, bot in enumerate(game.bots):
+            won = int(game.won != bot.spy)
+            for b, other in enumerate(game.bots):
+                if a == b:
+                    continue
+                if bot.spy != other.spy:
+                    relation = 'opposed'
+                else:
+                    relation = 'spies' if bot.spy else 'resistance'
+                i = ids[a] * n + ids[b]
+                self.counters[relation, 'games'][i] += 1
+                self.counters[relation, 'wins'][i] += won
+                self.counters[relation, 'leads'][i] += game.leads[a]
+                self.counters[relation, 'picks'][i] += game.picks[a][b]
+
+    def rate(self, relation, a, b, counter = 'wins', over = 'games'):
+        """Ratio of two counters for bot ids A and B, e.g. the win rate."""
+        i = a * len(self.names) + b
+        return Variable(self.counters[relation, counter][i], self.counters[relation, over][i])
+
+    def table(self, relation = 'opposed'):
+        """Lines of text with the win rate of each bot (row) in games with each
+        other bot (column), for the given relation."""
+        n = len(self.names)
+        ids = [a for a in range(n) if any([self.counters[r, 'games'][a*n+b] for r in self.RELATIONS for b in range(n)])]
+        lines = ['{0:<18s}'.format(relation.upper()) + ' '.join(['{0:>8s}'.format(self.names[b][:8]) for b in ids])]
+        for a in ids:
+            lines.append('  {0:<16s}'.format(self.names[a]) + ' '.join(['{0:>8s}'.format(repr(self.rate(relation, a, b))) for b in ids]))
+        return lines
+
+    def csv(self, filename):
+        with open(filename, 'w') as f:
+            f.write('bot,other,relation,' + ','.join(self.COUNTERS) + '\n')
+            n = len(self.names)
+            for a, b in itertools.product(range(n), range(n)):
+                for r in self.RELATIONS:
+                    values = [self.counters[r, c][a*n+b] for c in self.COUNTERS]
+                    if values[0]:
+                        f.write('%s,%s,%s,' % (self.names[a], self.names[b], r) + ','.join([str(v) for v in values]) + '\n')
+
+    def __iadd__(self, other):
+        for k, v in other.counters.items():
+            counter = self.counters[k]
+            for i, value in (v.items() if isinstance(v, dict) else enumerate(v)):
+                if value:
+                    counter[i] += value
+        return self
+
+
 class CompetitionRound(Game):
 
-    def __init__(self, *args):
-        super(CompetitionRound, self).__init__(*args)
+    def __init__(self, bots, roles, timing = False, pairwise = False, record = False, announcements = False,
+                 trusted = False, oracle = False):
+        super(CompetitionRound, self).__init__(bots, roles, trusted = trusted, oracle = oracle)
         self.statistics = collections.defaultdict(CompetitionStatistics)
+        self.latency = collections.defaultdict(CompetitionLatency)
+
+        # For pairwise statistics, count the teams selected by each leader and
+        # how many times each other player was picked, indexed by seat.
+        self.pairwise = pairwise
+        if pairwise:
+            self.leads = [0] * len(self.bots)
+            self.picks = [[0] * len(self.bots) for _ in self.bots]
+
+        # Keep track of everything that happens to store a binary record.
+        self.recorder = GameRecorder(announcements) if record else None
+
+        # Optionally instrument every call made to the bots, per instance.
+        if timing:
+            for bot in self.bots:
+                calls = self.latency[bot.name].calls
+                for name in TIMED_CALLS:
+                    setattr(bot, name, timed(getattr(bot, name), calls[name]))
+            self.setupDispatch()
+
+    def onMissionAttempt(self, mission, tries, leader):
+        if self.recorder:
+            self.recorder.attempt(mission, tries, leader)
+
+    def onTeamSelected(self, leader, team):
+        if self.recorder:
+            self.recorder.selected(team)
+
+    def onVoteComplete(self, votes):
+        if self.recorder:
+            self.recorder.voted(votes)
+
+    def onMissionComplete(self, sabotaged):
+        super(CompetitionRound, self).onMissionComplete(sabotaged)
+        if self.recorder:
+            self.recorder.sabotaged(sabotaged)
+
+    def onAnnouncement(self, player, announcement):
+        super(CompetitionRound, self).onAnnouncement(player, announcement)
+        if self.recorder:
+            self.recorder.announced(player, announcement)
 
     def onPlayerVoted(self, player, vote, leader, team):
         s = self.statistics[player.name]
@@ -78,8 +234,11 @@ class CompetitionRound(Game):
                 s.resVoted.sample(int(vote))
    
     def onPlayerSelected(self, player, team):
-        # TODO: Detailed statistics indicating selection by each other
-        # player, and whether or not the other is playing as spy.
+        if self.pairwise:
+            self.leads[player.index] += 1
+            for t in team:
+                self.picks[player.index][t.index] += 1
+
         spies = [t for t in team if t.spy]
         
         s = self.statistics[player.name]
@@ -96,14 +255,87 @@ class CompetitionRound(Game):
                 s.resSelected.sample(int(bot in team))
 
 
-def setup():
-    import signal
+# All the unique ways of assigning two spies to a table of five players.
+ROLES = sorted(set(itertools.permutations([True, True, False, False, False])))
+
+# Number of times a failing game is played again with a fresh seed, if enabled.
+MAX_RETRIES = 3
+
+# Number of games queued up per worker process, which bounds memory use.
+BACKLOG = 4
+
+# Minimum number of seconds between two checkpoints of a running competition.
+CHECKPOINT_INTERVAL = 60.0
+
+
+# Bot classes loaded once by each worker process, which the games refer to by
+# their index to avoid pickling the classes for every task.
+COMPETITORS = []
+
+
+def setup(requests):
+    """Initializer for the worker processes that imports all the competitors
+    upfront, in the same order as `CompetitionPool.competitors`."""
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    COMPETITORS[:] = unique(getCompetitors(requests))
+
+
+def seedType(text):
+    """Argument type for the seed of a whole run, which must fit in 32 bits."""
+    seed = int(text)
+    if not 0 <= seed < 2**32:
+        raise argparse.ArgumentTypeError("must be between 0 and 2**32-1, not %s" % (text))
+    return seed
+
+
+def gameSeed(seed, number):
+    """Seed for an individual game, derived from the seed of the whole run so
+    the outcome of each game doesn't depend on which worker plays it."""
+    return seed * 2**32 + number
 
 
-def play(args):
-    (players, roles) = args
-    g = CompetitionRound(players, roles)
+# Checks made by the game on what the bots return, by the phase they're in.
+VALIDATIONS = {'get_selection': 'select', 'get_votes': 'vote', 'get_sabotages': 'sabotage',
+               'do_announcements': 'announce'}
+
+
+class GameTimeout(Exception):
+    pass
+
+
+def expired(signum, frame):
+    raise GameTimeout("The game took too long to play.")
+
+
+def blame(traceback):
+    """Find the bot responsible for an exception, and the phase of the game,
+    from the frames of the traceback.  That's the outermost call to the bot's
+    API, or if the game rejected what was returned, the bot it was checking.
+    Returns None for the bot if it's not clear which one failed."""
+    bot, phase = None, None
+    while traceback is not None:
+        frame = traceback.tb_frame
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, Bot) and frame.f_code.co_name in TIMED_CALLS:
+            return owner.name, frame.f_code.co_name
+        if isinstance(owner, Game):
+            phase = VALIDATIONS.get(frame.f_code.co_name, frame.f_code.co_name)
+            suspects = [frame.f_locals.get(k) for k in ['p', 'leader']]
+            bot = ([b.name for b in suspects if isinstance(b, Bot)] or [None])[0]
+        traceback = traceback.tb_next
+    return bot, phase
+
+
+def retrySeed(seed, attempt):
+    """Fresh seed for playing a game again after it failed, which is never the
+    same as the seed of another game in the competition.  Records store the
+    scheduled seed along with the attempt, so this doesn't need to fit."""
+    return seed + attempt * 2**64 if attempt else seed
+
+
+def playGame(players, roles, seed, **options):
+    random.seed(seed)
+    g = CompetitionRound(players, roles, **options)
     g.channel = None
     g.run()
 
@@ -113,15 +345,211 @@ def play(args):
             s.spyWins.sample(int(not g.won))
         else:
             s.resWins.sample(int(g.won))
-    return g.statistics
+    return g
+
+
+def play(args, options):
+    (number, seed, ids, roles) = args
+    players = [COMPETITORS[i] for i in ids]
+    return playGame(players, roles, seed, **options)
+
+
+def playTimed(args, options, timeout):
+    """Play a game, interrupting it with `GameTimeout` after a number of
+    seconds.  This relies on SIGALRM, so only works on Unix."""
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return play(args, options)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class CompetitionResults(object):
+    """Everything measured in a batch of games, merged in the worker so only
+    one result is sent back to the runner per batch."""
+
+    def __init__(self):
+        self.games = 0
+        self.statistics = collections.defaultdict(CompetitionStatistics)
+        self.latency = collections.defaultdict(CompetitionLatency)
+        self.pairwise = None
+        self.outcomes = None
+        self.records = []
+        # Games that failed, by bot and phase, with the first of each kind.
+        self.errors = collections.Counter()
+        self.examples = {}
+        self.discarded = 0
+
+    def add(self, game, args, retry = 0):
+        (number, seed, ids, roles) = args
+        # Pack the record first, so a game that can't be recorded doesn't
+        # leave partial results behind.
+        if game.recorder:
+            spies = [b.index for b in game.bots if b.spy]
+            self.records.append(game.recorder.pack(number, seed, ids, spies, game.won, retry))
+        self.games += 1
+        if self.outcomes is not None:
+            self.outcomes.append(([b.name for b in game.bots if b.spy],
+                                  [b.name for b in game.bots if not b.spy], game.won))
+        for p, s in game.statistics.items():
+            self.statistics[p] += s
+        for p, l in game.latency.items():
+            self.latency[p] += l
+        if self.pairwise is not None:
+            self.pairwise.add(game, ids)
+
+    def fail(self, args, name, phase, error):
+        (number, seed, ids, roles) = args
+        self.errors[name, phase] += 1
+        if (name, phase) not in self.examples:
+            self.examples[name, phase] = (number, seed, '%s: %s' % (type(error).__name__, error))
+
+
+def playBatch(task):
+    """Play a whole batch of games in the worker with the same options."""
+    (options, games) = task
+    options = dict(options)
+    results = CompetitionResults()
+    if options.get('pairwise'):
+        results.pairwise = PairwiseStatistics([bot.__name__ for bot in COMPETITORS], sparse = True)
+    # Ratings are updated in order by the runner, from each game's outcome.
+    if options.pop('rating', False):
+        results.outcomes = []
+    # Failing games are discarded, or played again with another seed, unless
+    # the errors should be raised.
+    errors = options.pop('errors', 'raise')
+    retries = MAX_RETRIES if errors == 'retry' else 0
+    timeout = options.pop('timeout', None)
+    if timeout:
+        signal.signal(signal.SIGALRM, expired)
+
+    for game in games:
+        (number, seed, ids, roles) = game
+        for attempt in range(retries + 1):
+            played = (number, retrySeed(seed, attempt), ids, roles)
+            try:
+                g = playTimed(played, options, timeout) if timeout else play(played, options)
+                results.add(g, game, attempt)
+            except Exception as e:
+                if errors == 'raise':
+                    raise
+                name, phase = blame(sys.exc_info()[2])
+                results.fail(played, name, phase, e)
+            else:
+                break
+        else:
+            results.games += 1
+            results.discarded += 1
+    return results
+
+
+def batches(iterable, size):
+    """Split an iterable into lists of the given size, on demand."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            break
+        yield batch
+
+
+def dispatch(pool, function, tasks, backlog, pending = None):
+    """Lazily submit the tasks to the pool, keeping only a limited number in
+    flight, and yield the results in order.  Unlike `Pool.imap` this doesn't
+    consume the whole iterator upfront, so games start immediately.  The
+    results in flight are kept in `pending`, if given, for callers that stop
+    early to wait for them."""
+    if pending is None:
+        pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= backlog:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+class CompetitionPool(object):
+    """Long-lived pool of worker processes that have all the competitors
+    preloaded.  It can be shared by multiple runners, e.g. for elimination
+    rounds or parameter sweeps, so process startup and imports only happen
+    once.  Games are dispatched with bots referred to by index."""
+
+    def __init__(self, requests, processes = None):
+        self.competitors = unique(getCompetitors(requests))
+        self.ids = dict((bot, i) for i, bot in enumerate(self.competitors))
+        self.processes = processes or multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(self.processes, setup, (requests,))
+
+    def index(self, bot):
+        if bot not in self.ids:
+            raise ValueError("Bot %s was not preloaded in the pool." % (bot.__name__))
+        return self.ids[bot]
+
+    def dispatch(self, function, tasks, pending = None):
+        return dispatch(self.pool, function, tasks, self.processes * BACKLOG, pending)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        self.pool.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.terminate()
 
 
 class CompetitionRunner(object):
 
-    def __init__(self, competitors, rounds, quiet = False):
+    def __init__(self, competitors, rounds, quiet = False, schedule = 'random', batch = 1, pool = None, seed = None,
+                 adaptive = None, interval = 250, checkpoint = None, timing = False,
+                 pairwise = False, rating = False, record = None, announcements = False, trusted = False,
+                 oracle = False, errors = 'discard', timeout = None):
         self.rounds = rounds
+        self.played = 0
         self.quiet = quiet
+        self.schedule = schedule
+        self.batch = batch
+        self.pool = pool
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        # Seeds of the games must fit in 64 bits to be recorded, see `gameSeed`.
+        if not 0 <= self.seed < 2**32:
+            raise ValueError("The seed of a competition must be between 0 and 2**32-1, not %i." % (self.seed))
+        # Stop before the requested number of rounds once the rankings of
+        # 'all' adjacent bots, or only the 'last' two, are separated.
+        self.adaptive = adaptive
+        self.interval = interval
+        # File where the progress is saved regularly, see `resume()`.
+        self.checkpoint = checkpoint
+        self.timing = timing
         self.statistics = collections.defaultdict(CompetitionStatistics)
+        self.latency = collections.defaultdict(CompetitionLatency)
+        self.pairwise = pairwise
+        self.matrix = None
+        # Team-based skill ratings, which are used for the rankings if enabled.
+        self.ratings = RatingEngine() if rating else None
+        # File where a binary record of every game is stored, if specified.
+        self.record = record
+        self.announcements = announcements
+        self.writer = None
+        # Number of records written, which is less than the number of games
+        # played if some were discarded.
+        self.recorded = 0
+        # Skip validating the bots' decisions, for bots known to be correct.
+        self.trusted = trusted
+        # Reveal the true roles to bots that opt in, for measurement runs only.
+        self.oracle = oracle
+        # Games where a bot fails are discarded, retried or stop the run with
+        # 'raise', and optionally interrupted after a number of seconds.
+        self.errors = errors
+        self.timeout = timeout
+        self.failures = collections.Counter()
+        self.examples = {}
+        self.discarded = 0
 
         # Make sure there are sufficient entrants if necessary.
         # WARNING: Results in multiple bot instances per game!
@@ -130,24 +558,58 @@ class CompetitionRunner(object):
             self.competitors.extend(competitors)
 
     def listGameSelections(self):
-        """Evaluate all bots in all possible permutations!  If there are more
-        games requested, randomly fill up from a next round of permutations."""
-        if not self.competitors: raise StopIteration 
-
-        p = []
-        r = set(itertools.permutations([True, True, False, False, False]))
-        for players in itertools.permutations(self.competitors, 5):
-            for roles in r:
-                p.append((players, roles))
-
-        permutations = []
-        while len(permutations) < self.rounds:
-            random.shuffle(p)
-            permutations.extend(p)
-        
-        for players, roles in permutations[:self.rounds]:
+        """Stream the seatings and role layouts for all the games requested,
+        generated on demand so memory use doesn't depend on the number of
+        competitors.  The 'random' schedule draws each game uniformly from
+        all possible permutations, while 'balanced' deals the competitors
+        round-robin so that every bot plays equally often."""
+        if not self.competitors: return
+
+        # The schedule has its own generator so it's reproducible from the seed.
+        rng = random.Random(self.seed)
+        if self.schedule == 'balanced':
+            seatings = self._balancedSeatings(rng)
+        else:
+            seatings = self._randomSeatings(rng)
+
+        for players, roles in itertools.islice(seatings, self.rounds):
             yield (players, roles)
 
+    def _randomSeatings(self, rng):
+        while True:
+            yield (tuple(rng.sample(self.competitors, 5)), rng.choice(ROLES))
+
+    def _balancedSeatings(self, rng):
+        # Deal from a shuffled deck of competitors, refilling it once there
+        # aren't enough left for a table.  Bots already seated are put back on
+        # top of the deck for the next game, which keeps the counts even.
+        deck = collections.deque()
+        layouts = []
+        while True:
+            seated, skipped = [], []
+            while len(seated) < 5:
+                if not deck:
+                    order = list(range(len(self.competitors)))
+                    rng.shuffle(order)
+                    deck.extend(order)
+                i = deck.popleft()
+                if i in seated:
+                    skipped.append(i)
+                else:
+                    seated.append(i)
+            deck.extendleft(reversed(skipped))
+
+            if not layouts:
+                layouts = ROLES[:]
+                rng.shuffle(layouts)
+            yield (tuple(self.competitors[i] for i in seated), layouts.pop())
+
+    def replay(self, number):
+        """Play a single game from the schedule again in this process, with the
+        same seating, roles and seed, e.g. to debug a crash in isolation."""
+        players, roles = next(itertools.islice(self.listGameSelections(), number, None))
+        return playGame(players, roles, gameSeed(self.seed, number), trusted = self.trusted, oracle = self.oracle)
+
     def main(self):
         names = [bot.__name__ for bot in self.competitors]
         for bot in self.competitors:
@@ -155,23 +617,145 @@ class CompetitionRunner(object):
                 bot.onCompetitionStarting(names)
 
         if not self.quiet:
-            print("Running competition with %i bots." % (len(self.competitors)), file=sys.stderr)
+            print("Running competition with %i bots (seed %i)." % (len(self.competitors), self.seed), file=sys.stderr)
 
         def output(text):
             sys.stdout.write(text)
             sys.stdout.flush()
 
-        pool = multiprocessing.Pool(multiprocessing.cpu_count(), setup)
-        # pool = itertools
-        for i, stats in enumerate(pool.imap(play, self.listGameSelections())):
-            for p, s in stats.items():
-                self.statistics[p] += s
+        # Use the shared pool of workers if there's one, or a temporary pool.
+        pool = self.pool or CompetitionPool(self.competitors)
+        # When resuming, skip over the games that were already played.
+        schedule = itertools.islice(enumerate(self.listGameSelections()), self.played, None)
+        games = ((i, gameSeed(self.seed, i), tuple(pool.index(b) for b in players), roles)
+                 for i, (players, roles) in schedule)
+        options = {'timing': self.timing, 'pairwise': self.pairwise, 'rating': self.ratings is not None,
+                   'trusted': self.trusted, 'oracle': self.oracle, 'errors': self.errors, 'timeout': self.timeout}
+        if self.record:
+            names = [bot.__name__ for bot in pool.competitors]
+            resume = self.recorded if os.path.exists(self.record) and self.played else None
+            self.writer = RecordWriter(self.record, names, self.announcements, resume)
+            options.update({'record': True, 'announcements': self.announcements})
+        tasks = ((options, batch) for batch in batches(games, self.batch))
+        check = self.played + self.interval
+        saved = time.time()
+        pending = collections.deque()
+        try:
+            for results in pool.dispatch(playBatch, tasks, pending):
+                self.merge(results)
+
+                if not self.quiet:
+                    count = results.games
+                    for i in range(self.played-count+1, self.played+1):
+                        if i % 500 == 0:  output('(%02i%%)\n' % (100*i/self.rounds))
+                        elif i % 125 == 0: output('O')
+                        elif i %  25 == 0: output('o')
+                        elif i %  5 == 0: output('.')
+
+                if self.checkpoint and time.time() - saved >= CHECKPOINT_INTERVAL:
+                    self.save(self.checkpoint)
+                    saved = time.time()
+
+                if self.adaptive and self.played >= check:
+                    check += self.interval
+                    if self.separated(last = self.adaptive == 'last'):
+                        if not self.quiet:
+                            print("\nStopped after %i games, the rankings are separated." % (self.played), file=sys.stderr)
+                        # The games in flight on a shared pool would otherwise
+                        # keep its workers busy for the next runner, so wait
+                        # for them and discard their results.
+                        if pool is self.pool:
+                            for p in pending:
+                                p.wait()
+                        break
+        finally:
+            if pool is not self.pool:
+                pool.terminate()
+            if self.checkpoint:
+                self.save(self.checkpoint)
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+                self.index()
+
+    def index(self):
+        """Build the sidecar index of the game records so they can be queried
+        via the `archive` module, if NumPy is available."""
+        try:
+            import archive
+        except ImportError:
+            return
+        archive.update(self.record)
+
+    def merge(self, results):
+        for p, s in results.statistics.items():
+            self.statistics[p] += s
+        for p, l in results.latency.items():
+            self.latency[p] += l
+        if results.pairwise is not None:
+            if self.matrix is None:
+                self.matrix = PairwiseStatistics(results.pairwise.names)
+            self.matrix += results.pairwise
+        if results.outcomes is not None:
+            for spies, resistance, won in results.outcomes:
+                self.ratings.update(spies, resistance, won)
+        if self.writer:
+            self.writer.write(b''.join(results.records))
+            self.recorded += len(results.records)
+        self.failures.update(results.errors)
+        for k, v in results.examples.items():
+            self.examples.setdefault(k, v)
+        self.discarded += results.discarded
+        self.played += results.games
+
+    def save(self, filename):
+        """Store the merged statistics along with the position in the schedule
+        and its seed, writing to a temporary file first so an interruption
+        never leaves a corrupt checkpoint behind."""
+        if self.writer:
+            self.writer.flush()
+        data = {
+            'competitors': [bot.__name__ for bot in self.competitors],
+            'schedule': self.schedule,
+            'seed': self.seed,
+            'played': self.played,
+            'statistics': dict(self.statistics),
+            'latency': dict(self.latency),
+            'matrix': self.matrix,
+            'ratings': self.ratings,
+            'failures': self.failures,
+            'examples': self.examples,
+            'discarded': self.discarded,
+            'recorded': self.recorded,
+        }
+        with open(filename + '.tmp', 'wb') as f:
+            pickle.dump(data, f, 2)
+        getattr(os, 'replace', os.rename)(filename + '.tmp', filename)
+
+    def resume(self, filename):
+        """Restore the progress from a checkpoint, so that `main()` continues
+        the schedule exactly where it stopped."""
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
 
-            if not self.quiet:
-                if (i+1) % 500 == 0:  output('(%02i%%)\n' % (100*(i+1)/self.rounds))
-                elif (i+1) % 125 == 0: output('O')
-                elif (i+1) %  25 == 0: output('o')
-                elif (i+1) %  5 == 0: output('.')
+        names = [bot.__name__ for bot in self.competitors]
+        if data['competitors'] != names:
+            raise ValueError("Checkpoint was for a competition between %s." % (', '.join(data['competitors'])))
+
+        self.schedule = data['schedule']
+        self.seed = data['seed']
+        self.played = data['played']
+        self.statistics.clear()
+        self.statistics.update(data['statistics'])
+        self.latency.clear()
+        self.latency.update(data['latency'])
+        self.matrix = data['matrix']
+        self.ratings = data['ratings']
+        self.failures = data.get('failures', collections.Counter())
+        self.examples = data.get('examples', {})
+        self.discarded = data.get('discarded', 0)
+        # Older checkpoints were only made without discarding games.
+        self.recorded = data.get('recorded', self.played)
 
     def echo(self, *args):
         print(' '.join([str(a) for a in args]))
@@ -182,18 +766,35 @@ class CompetitionRunner(object):
                 self.statistics[name].total())
 
     def rank(self, name):
-        results = sorted(self.statistics.items(), key = lambda x: x[1].total().estimate(), reverse=True)
+        results = sorted(self.results(), key = lambda x: x[1].estimate(), reverse=True)
         for i in range(len(results)):
             if results[i][0] == name:
                 return i
         return None
 
+    def separated(self, last = False):
+        """Check if the confidence intervals of all adjacent bots in the ranking
+        no longer overlap, or only those of the last two bots."""
+        results = sorted([s for n, s in self.results()], key = lambda v: v.value(), reverse = True)
+        pairs = list(zip(results, results[1:]))
+        if last:
+            pairs = pairs[-1:]
+        if not pairs:
+            return False
+        return all([a.value() - a.error() > b.value() + b.error() for a, b in pairs])
+
+    def results(self):
+        """Overall score of each bot by name, which is its skill rating if
+        those are enabled, or otherwise its total win rate."""
+        if self.ratings is not None:
+            return [(n, self.ratings.get(n)) for n in self.statistics]
+        return [(n, s.total()) for n, s in self.statistics.items()]
+
     def last(self):
-        results = sorted(self.statistics, key=lambda x: self.statistics[x].total().estimate(), reverse=True)
-        bot = [c for c in self.competitors if c.__name__ == results[-1]][0]
-        other = [c for c in self.competitors if c.__name__ == results[-2]][0]
-        return (bot, self.statistics[results[-1]].total()),                  \
-               (other, self.statistics[results[-2]].total())
+        results = sorted(self.results(), key = lambda x: x[1].estimate(), reverse = True)
+        bot = [c for c in self.competitors if c.__name__ == results[-1][0]][0]
+        other = [c for c in self.competitors if c.__name__ == results[-2][0]][0]
+        return (bot, results[-1][1]), (other, results[-2][1])
 
     def show(self, summary = False):
         print("")
@@ -218,10 +819,54 @@ class CompetitionRunner(object):
             self.echo(" ", '{0:<16s}'.format(s[0]), s[1].total().detail())
         self.echo("")
 
+        if self.ratings is not None:
+            self.echo("RATING")
+            for name in self.ratings.ranking():
+                self.echo(" ", '{0:<16s}'.format(name), self.ratings.get(name).detail())
+            self.echo("")
+
+        if self.latency:
+            self.echo('{0:<35s}'.format("LATENCY"), "   calls       mean        p95        max")
+            for name, l in sorted(self.latency.items(), key = lambda x: x[1].total(), reverse = True):
+                for call in TIMED_CALLS:
+                    if l.calls[call].samples:
+                        self.echo(" ", '{0:<16s}'.format(name), '{0:<16s}'.format(call), l.calls[call].detail())
+            self.echo("")
+
+        if self.matrix is not None:
+            for line in self.matrix.table():
+                self.echo(line)
+            self.echo("")
+
+        if self.failures:
+            self.echo('{0:<35s}'.format("ERRORS"), "  games    rate   first")
+            for (name, phase), count in sorted(self.failures.items(), key = lambda x: x[1], reverse = True):
+                games = self.statistics[name].total().samples if name in self.statistics else 0
+                number, seed, error = self.examples[name, phase]
+                self.echo(" ", '{0:<16s}'.format(str(name)), '{0:<16s}'.format(str(phase)), "%6i  %5.1f%%   #%i %s" % (
+                          count, 100.0 * count / (games + count), number, error))
+            if self.discarded:
+                self.echo("  %i games were discarded, replay one with --game to debug it." % (self.discarded))
+            self.echo("")
+
+
+def unique(competitors):
+    """Remove duplicate bots from a list, preserving the original order."""
+    result = []
+    for bot in competitors:
+        if bot not in result:
+            result.append(bot)
+    return result
+
 
 def getCompetitors(argv):
     competitors = []
     for request in argv:
+        # Bot classes that are already loaded are accepted as-is.
+        if isinstance(request, type):
+            competitors.append(request)
+            continue
+
         if os.path.exists(request):
             sys.path.insert(0, os.path.dirname(request))
             request = os.path.splitext(os.path.basename(request))[0]
@@ -247,15 +892,70 @@ def getCompetitors(argv):
     return competitors
 
 if __name__ == '__main__':
-    if len(sys.argv) <= 2:
-        print('USAGE: competition.py 10000 (filename|module.BotName) [...]')
-        sys.exit(-1)
+    parser = argparse.ArgumentParser(usage='competition.py 10000 (filename|module.BotName) [...]')
+    parser.add_argument('rounds', type=int,
+                help = "Number of games to play in the competition.")
+    parser.add_argument('bots', nargs='+',
+                help = "Bots to evaluate, as a filename or module.BotName.")
+    parser.add_argument('--schedule', choices=['random', 'balanced'], default='random',
+                help = "Draw seatings at random, or deal them round-robin.")
+    parser.add_argument('--batch', type=int, default=1,
+                help = "Number of games played per task in each worker process.")
+    parser.add_argument('--seed', type=seedType, default=None,
+                help = "Seed for the whole run, to reproduce the results exactly.")
+    parser.add_argument('--adaptive', choices=['all', 'last'], default=None,
+                help = "Stop early once all bots, or the last two, are ranked apart.")
+    parser.add_argument('--interval', type=int, default=250,
+                help = "Number of games between checks of the adaptive rankings.")
+    parser.add_argument('--timing', action='store_true',
+                help = "Measure how long each bot takes to respond to every call.")
+    parser.add_argument('--pairwise', action='store_true',
+                help = "Collect head-to-head statistics for every pair of bots.")
+    parser.add_argument('--csv', type=str, default=None,
+                help = "Export the head-to-head statistics to this CSV file.")
+    parser.add_argument('--rating', action='store_true',
+                help = "Rate the bots by team-based skill, and rank them by it.")
+    parser.add_argument('--record', type=str, default=None,
+                help = "File where a compact binary record of every game is stored.")
+    parser.add_argument('--announcements', action='store_true',
+                help = "Also store the announcements in the game records.")
+    parser.add_argument('--trusted', action='store_true',
+                help = "Skip validating the bots' decisions, faster but only for bots known to be correct.")
+    parser.add_argument('--oracle', action='store_true',
+                help = "Reveal the true roles to bots that opt in via Bot.ORACLE, for measurements only.")
+    parser.add_argument('--errors', choices=['raise', 'discard', 'retry'], default='discard',
+                help = "Stop the run when a bot fails, discard the game, or play it again with another seed.")
+    parser.add_argument('--timeout', type=float, default=None,
+                help = "Number of seconds after which a game is interrupted as failed.")
+    parser.add_argument('--checkpoint', type=str, default=None,
+                help = "File where progress is saved regularly during the run.")
+    parser.add_argument('--resume', type=str, default=None,
+                help = "Continue the run saved in this checkpoint file.")
+    parser.add_argument('--game', type=int, default=None,
+                help = "Replay only this game number from the run, in-process.")
+    args = parser.parse_args()
+
+    competitors = getCompetitors(args.bots)
+    runner = CompetitionRunner(competitors, args.rounds, schedule = args.schedule, batch = args.batch, seed = args.seed,
+                                adaptive = args.adaptive, interval = args.interval,
+                                checkpoint = args.checkpoint or args.resume, timing = args.timing,
+                                pairwise = args.pairwise or bool(args.csv), rating = args.rating,
+                                record = args.record, announcements = args.announcements, trusted = args.trusted,
+                                oracle = args.oracle, errors = args.errors, timeout = args.timeout)
+    if args.resume:
+        runner.resume(args.resume)
+
+    if args.game is not None:
+        g = runner.replay(args.game)
+        print("GAME #%i (seed %i): %r" % (args.game, gameSeed(runner.seed, args.game), g.bots))
+        print("RESISTANCE WIN." if g.won else "SPIES WIN...")
+        sys.exit(0)
 
-    competitors = getCompetitors(sys.argv[2:])
-    runner = CompetitionRunner(competitors, int(sys.argv[1]))
     try:
         runner.main()
     except (KeyboardInterrupt, SystemExit):
         pass
     finally:
         runner.show()
+        if args.csv and runner.matrix is not None:
+            runner.matrix.csv(args.csv)
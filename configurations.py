@@ -0,0 +1,78 @@
+"""Shared engine for reasoning about which players could be the spies, used by
+the logical bots.  A configuration is a bitmask with the seats of the spies
+set, see `game.bitmask()`, so checking a team against all the possible
+configurations only takes integer operations.
+
+The configurations for each game size are computed once and shared, and the
+functions below operate on lists of them, returning new lists, so bots can
+keep filtering their own copy as the game progresses.
+"""
+
+import itertools
+
+from game import bitmask
+
+
+# Number of bits set in all masks for up to 10 players.
+POPCOUNT = tuple([bin(i).count('1') for i in range(1 << 10)])
+
+_CACHE = {}
+
+
+def configurations(players = 5, spies = 2, exclude = None):
+    """All the possible configurations of spies in a game, optionally without
+    those that include the given index, e.g. for a bot that knows its role."""
+    key = (players, spies, exclude)
+    if key not in _CACHE:
+        masks = [sum([1 << i for i in c]) for c in itertools.combinations(range(players), spies)]
+        if exclude is not None:
+            masks = [m for m in masks if not m & (1 << exclude)]
+        _CACHE[key] = tuple(masks)
+    return list(_CACHE[key])
+
+
+def _mask(team):
+    return team if isinstance(team, int) else bitmask(team)
+
+
+def spiesOnTeam(configs, team):
+    """Number of spies on the team for each of the configurations."""
+    t = _mask(team)
+    return [POPCOUNT[c & t] for c in configs]
+
+
+def consistent(configs, team, sabotaged, optimistic = False):
+    """Configurations that could explain the number of sabotages on a mission.
+    Pessimistic filtering only requires there to be enough spies on the team,
+    while optimistic filtering assumes all the spies sabotaged."""
+    t = _mask(team)
+    if optimistic:
+        return [c for c in configs if POPCOUNT[c & t] == sabotaged]
+    return [c for c in configs if POPCOUNT[c & t] >= sabotaged]
+
+
+def clean(configs, team):
+    """Configurations in which there are no spies on the team."""
+    t = _mask(team)
+    return [c for c in configs if not c & t]
+
+
+def spiesIn(config, players):
+    """Players that are spies in the configuration."""
+    return [p for p in players if config >> p.index & 1]
+
+
+def resistanceIn(config, players):
+    """Players that are resistance in the configuration."""
+    return [p for p in players if not config >> p.index & 1]
+
+
+def marginals(configs, players, weights = None):
+    """Probability of each player being a spy, given the configurations and
+    optionally their relative likelihoods, as a dictionary."""
+    if weights is None:
+        weights = [1.0] * len(configs)
+    total = float(sum(weights))
+    if not total:
+        return dict((p, 0.0) for p in players)
+    return dict((p, sum([w for c, w in zip(configs, weights) if c >> p.index & 1]) / total) for p in players)
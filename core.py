@@ -6,27 +6,66 @@ class Observable(type):
     in derived classes without having to explicitly call the base class.  The
     observers of the base classes are always called before those of the
     specialized classes.
+
+    The observers of each class are resolved once when it's created, into a
+    flat chain of functions per callback, so calling them doesn't require
+    walking the base classes every time.  Callbacks without observers call
+    the base implementation directly.
+
+    An observer may still call the base class explicitly with super(), e.g.
+    to share code with Python 3 where the meta-class isn't used.  The chain
+    it's called from already includes the observers of the base classes, so
+    they're not run again.
     """
     def __new__(cls, name, parents, dct):
         __hooks__ = collections.defaultdict(list)
         if name != 'Bot':
-            for (k, v) in dct.items():
+            for (k, v) in list(dct.items()):
                 if not k.startswith('on'):
                     continue
                 __hooks__[k].append(v)
                 del dct[k]
             dct['__hooks__'] = __hooks__
+            return Observable.compile(super(Observable, cls).__new__(cls, name, parents, dct))
         else:
-            for (k, v) in dct.items():
-                if not k.startswith('on'):
-                    continue
-                def bind(name=k, function=v):
-                    def wrap(self, *args, **kwargs):
-                        for c in reversed(self.__class__.__mro__):                            
-                            if hasattr(c, '__hooks__'):
-                                for m in c.__hooks__.get(name, []):
-                                    m(self, *args, **kwargs)
-                        return function(self, *args, **kwargs)
-                    return wrap
-                dct[k] = bind()
-        return super(Observable, cls).__new__(cls, name, parents, dct)
+            # Keep the base implementations to call at the end of each chain.
+            dct['__events__'] = dict((k, v) for (k, v) in dct.items() if k.startswith('on'))
+            dct['__compiled__'] = frozenset(dct['__events__'])
+            # Names of the callbacks whose chain is running, for each bot.
+            dct['__running__'] = None
+            return super(Observable, cls).__new__(cls, name, parents, dct)
+
+    @staticmethod
+    def compile(c):
+        compiled = []
+        for k, function in getattr(c, '__events__', {}).items():
+            # Unless a mix-in class takes over the callback, it's resolved here.
+            owner = [b for b in c.__mro__[1:] if k in b.__dict__][0]
+            if k not in owner.__dict__.get('__compiled__', ()):
+                continue
+
+            chain = tuple([m for b in reversed(c.__mro__) for m in b.__dict__.get('__hooks__', {}).get(k, [])])
+            setattr(c, k, Observable.bind(k, chain, function))
+            compiled.append(k)
+        c.__compiled__ = frozenset(compiled)
+        return c
+
+    @staticmethod
+    def bind(name, chain, function):
+        if not chain:
+            return function
+        def wrap(self, *args, **kwargs):
+            running = self.__running__
+            if running is None:
+                running = self.__running__ = set()
+            elif name in running:
+                # Called via super() from an observer of this same chain.
+                return function(self, *args, **kwargs)
+            running.add(name)
+            try:
+                for m in chain:
+                    m(self, *args, **kwargs)
+            finally:
+                running.discard(name)
+            return function(self, *args, **kwargs)
+        return wrap
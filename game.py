@@ -1,6 +1,24 @@
 import itertools
 
-from player import Player
+from player import Player, Bot
+
+
+def bitmask(players):
+    """Integer with the bit of each player's index set, e.g. for teams."""
+    m = 0
+    for p in players:
+        m |= 1 << p.index
+    return m
+
+
+def popcount(m):
+    """Number of players in a bitmask."""
+    return bin(m).count('1')
+
+
+def overlap(a, b):
+    """Number of players in both bitmasks, e.g. spies in a team."""
+    return bin(a & b).count('1')
 
 
 class State(object):
@@ -20,6 +38,9 @@ class State(object):
     PHASE_ANNOUNCING = 4
 
 
+    __slots__ = ['phase', 'turn', 'tries', 'wins', 'losses', 'players', 'sabotages',
+                 '_leader', '_team', '_votes', 'leaderIndex', 'teamMask', 'votesMask']
+
     def __init__(self):
         self.phase = 0                  # int (0..4): Current game phase.
         self.turn = 1                   # int (1..5): Mission number.
@@ -32,11 +53,76 @@ class State(object):
         self.votes = None               # list[bool]: Votes for the mission.
         self.sabotages = None           # int (0..3): Number of sabotages.
 
+    # The team and votes are also stored as bitmasks indexed by player, and
+    # the leader by index, which are updated automatically.  These make it
+    # possible for bots to check teams with integer operations, and make
+    # comparisons and snapshots cheap.  See `bitmask()` and `overlap()`.
+
+    @property
+    def leader(self):
+        return self._leader
+
+    @leader.setter
+    def leader(self, leader):
+        self._leader = leader
+        self.leaderIndex = leader.index if leader is not None else None
+
+    @property
+    def team(self):
+        return self._team
+
+    @team.setter
+    def team(self, team):
+        self._team = team
+        self.teamMask = bitmask(team) if team is not None else None
+
+    @property
+    def votes(self):
+        return self._votes
+
+    @votes.setter
+    def votes(self, votes):
+        self._votes = votes
+        self.votesMask = sum([1 << i for i, v in enumerate(votes) if v]) if votes is not None else None
+
+    def spiesOnTeam(self, spiesMask):
+        """Number of the given spies on the current team."""
+        return overlap(self.teamMask, spiesMask)
+
+    def inTeam(self, player):
+        return bool(self.teamMask >> player.index & 1)
+
+    def votedFor(self, player):
+        return bool(self.votesMask >> player.index & 1)
+
+    def snapshot(self):
+        """Immutable copy of the state as a tuple, which can be stored and
+        passed to `restore()` later.  The players are shared, not copied."""
+        return (self.phase, self.turn, self.tries, self.wins, self.losses, self.leader,
+                self.players, self.sabotages, self.teamMask, self.votesMask)
+
+    def restore(self, snapshot):
+        """Set the state back to a snapshot; teams are listed in seat order."""
+        (self.phase, self.turn, self.tries, self.wins, self.losses, self.leader,
+         self.players, self.sabotages, team, votes) = snapshot
+        self._team = None if team is None else [p for p in self.players if team & (1 << p.index)]
+        self._votes = None if votes is None else [bool(votes & (1 << i)) for i in range(len(self.players))]
+        self.teamMask, self.votesMask = team, votes
+
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        s = cls.__new__(cls)
+        s.restore(snapshot)
+        return s
+
     def clone(self):
-        s = State()
-        s.__dict__ = self.__dict__.copy()
+        s = self.__class__.__new__(self.__class__)
+        for key in State.__slots__:
+            setattr(s, key, getattr(self, key))
         return s
 
+    __copy__ = clone
+
     def __eq__(self, other):
         return \
                 self.phase == other.phase           \
@@ -44,16 +130,19 @@ class State(object):
             and self.tries == other.tries           \
             and self.wins == other.wins             \
             and self.losses == other.losses         \
-            and self.leader == other.leader         \
-            and self.team == other.team             \
-            and self.players == other.players       \
-            and self.votes == other.votes           \
-            and self.sabotages == other.sabotages
+            and self.leaderIndex == other.leaderIndex \
+            and self.teamMask == other.teamMask     \
+            and self.votesMask == other.votesMask   \
+            and self.sabotages == other.sabotages   \
+            and (self.players is other.players or self.players == other.players)
+
+    def __ne__(self, other):
+        return not self == other
 
     def __repr__(self):
         output = "<State\n"
-        for key in sorted(self.__dict__):
-            value = self.__dict__[key]
+        for key in sorted([k.lstrip('_') for k in self.__slots__]):
+            value = getattr(self, key)
             output += "\t- %s: %r\n" % (key, value)
         return output + ">"
 
@@ -93,8 +182,11 @@ class BaseGame(object):
         pass
 
 
-    def __init__(self, state=None):
+    def __init__(self, state=None, trusted=False):
         self.state = state or State()
+        # Trusted games skip validating what the bots return, which is only
+        # safe if all the bots are known to be correct.
+        self.trusted = trusted
 
         # Configuration for the game itself.
         self.participants = [2, 3, 2, 3, 3]
@@ -108,10 +200,8 @@ class BaseGame(object):
             self.step()
         
         # Pass back the results to the bots so they can do some learning!
-        spies = set([Player(p.name, p.index) for p in self.bots if p.spy])
-        for p in self.bots:
-            p.onGameComplete(self.state.wins >= self.NUM_WINS, spies)
-        self.onGameComplete(self.state.wins >= self.NUM_WINS, spies)
+        spies = set([self.state.players[p.index] for p in self.bots if p.spy])
+        self.callback('onGameComplete', self.state.wins >= self.NUM_WINS, spies)
 
     @property
     def done(self):
@@ -153,8 +243,8 @@ class BaseGame(object):
         count = self.participants[self.state.turn-1]
         selected = self.get_selection(count)
 
-        # Copy the list to make sure no internal data is leaked to the other bots!
-        self.state.team = [Player(s.name, s.index) for s in selected]
+        # Use the shared immutable players, so no internal data is leaked to the other bots!
+        self.state.team = [self.state.players[s.index] for s in selected]
         self.callback('onTeamSelected', self.state.leader, self.state.team)
 
         self.state.phase = State.PHASE_VOTING
@@ -207,12 +297,16 @@ class BaseGame(object):
         """Phase 4) Allow bots to publicly announce what they want about the game.
         """
         for source, ann in self.get_announcements():
+            if self.trusted:
+                self.onAnnouncement(source, ann)
+                continue
+
             copy = {}
             assert type(ann) is dict, "Please return a dictionary from %s.announce(), not %s." % (p.name, type(ann))
             for k, v in ann.items():
                 assert isinstance(k, Player), "Please use Player objects as dictionary key in %s.announce()." % (p.name)
                 assert isinstance(v, float), "Please use floats as dictionary values in %s.announce()." % (p.name)
-                copy[Player(k.name, k.index)] = v
+                copy[self.state.players[k.index]] = v
 
             self.onAnnouncement(source, copy)
 
@@ -241,18 +335,41 @@ class BaseGame(object):
             assert False, "Not expecting this game phase."
 
 
+def implements(bot, name):
+    """Check if a bot does anything in the given callback, i.e. it's not the
+    default implementation from the `Bot` class that does nothing."""
+    if name in bot.__dict__:
+        return True
+    function, default = getattr(type(bot), name), getattr(Bot, name)
+    return getattr(function, '__func__', function) is not getattr(default, '__func__', default)
+
+
 class Game(BaseGame):
 
-    def __init__(self, bots, roles, state=None):
-        super(Game, self).__init__(state=state)
+    # Functions of the bots that are only called if they're implemented.
+    CALLBACKS = ['onGameRevealed', 'onMissionAttempt', 'onTeamSelected', 'onVoteComplete', 'onMissionComplete',
+                 'onMissionFailed', 'onAnnouncement', 'onGameComplete', 'announce']
+
+    def __init__(self, bots, roles, state=None, trusted=False, oracle=False):
+        super(Game, self).__init__(state=state, trusted=trusted)
+        # Give the true roles to the bots that ask for them via `Bot.ORACLE`.
+        self.oracle = oracle
 
         # Create Bot instances based on the constructor passed in.
         self.bots = [p(self.state, i, r) for p, r, i in zip(bots, roles, range(0, len(bots)))]
-        self.spies = set([Player(p.name, p.index) for p in self.bots if p.spy])
-        
+
         # Maintain a copy of players that includes minimal data, for passing to other bots.
+        # These are immutable and used everywhere else in the game, so sets and
+        # comparisons between them are cheap.
         self.state.players = [Player(p.name, p.index) for p in self.bots]
+        self.spies = set([self.state.players[p.index] for p in self.bots if p.spy])
         self.state.leader = self.next_leader()
+        self.setupDispatch()
+
+    def setupDispatch(self):
+        """Build the table of bots that implement each callback, so the others
+        aren't called at all.  Call this again if the bots are modified."""
+        self.dispatch = dict((name, [p for p in self.bots if implements(p, name)]) for name in self.CALLBACKS)
 
     def onPlayerSelected(self, player, team):
         pass
@@ -261,18 +378,26 @@ class Game(BaseGame):
         pass
 
     def callback(self, name, *args):
-        for p in self.bots:
+        for p in self.dispatch[name]:
             getattr(p, name)(*args)
         getattr(self, name)(*args)
 
     def onGameRevealed(self, players, spies):
         # Tell the bots who the spies are if they are allowed to know.        
+        spiesMask = bitmask(spies)
         for p in self.bots:
+            p.spiesMask = spiesMask if p.spy else 0
+            if self.oracle and p.ORACLE:
+                p.oracle = set(spies)
+        for p in self.dispatch['onGameRevealed']:
             p.onGameRevealed(self.state.players, spies if p.spy else set())
 
     def get_selection(self, count):
         leader = self.bots[self.state.leader.index]
         selected = leader.select(self.state.players, count)
+        if self.trusted:
+            self.onPlayerSelected(leader, [self.bots[i] for i in sorted([s.index for s in selected])])
+            return selected
 
         # Check the data returned by the bots is in the expected format!
         assert type(selected) in [list, set, tuple], "Expecting a list|set|tuple as a return value of select(), not %s." % type(selected)
@@ -288,10 +413,12 @@ class Game(BaseGame):
 
     def get_votes(self):
         votes = []
+        team = [b for b in self.bots if b in self.state.team]
         for p in self.bots:
             v = p.vote(self.state.team)
-            assert type(v) is bool, "Please return a boolean from %s.vote() instead of %s." % (p.name, type(v))
-            self.onPlayerVoted(p, v, self.state.leader, [b for b in self.bots if b in self.state.team])
+            if not self.trusted:
+                assert type(v) is bool, "Please return a boolean from %s.vote() instead of %s." % (p.name, type(v))
+            self.onPlayerVoted(p, v, self.state.leader, team)
             votes.append(v)
         return votes
 
@@ -299,13 +426,15 @@ class Game(BaseGame):
         # Pass back the results of the mission to the bots.
         # Process the team first to make sure any timing of the result
         # is the same for all player roles, specifically over IRC.
+        listeners = self.dispatch['onMissionComplete']
         for s in self.state.team:
             p = self.bots[s.index]
-            p.onMissionComplete(sabotaged)
+            if p in listeners:
+                p.onMissionComplete(sabotaged)
 
         # Now, with delays taken into account, all other results can be
         # passed back safely without divulging Spy/Resistance identities.
-        for p in [b for b in self.bots if b not in self.state.team]:
+        for p in [b for b in listeners if b not in self.state.team]:
             p.onMissionComplete(sabotaged)
         
     def get_sabotages(self):
@@ -313,13 +442,14 @@ class Game(BaseGame):
         for s in self.state.team:
             p = self.bots[s.index]
             result = p.sabotage() and p.spy
-            assert type(result) is bool, "Please return a boolean from %s.sabotage(), not %s." % (p.name, type(result))
+            if not self.trusted:
+                assert type(result) is bool, "Please return a boolean from %s.sabotage(), not %s." % (p.name, type(result))
             sabotaged += int(result)
         return sabotaged
 
     def onAnnouncement(self, player, announcement):
-        for other in [o for o in self.bots if o != player]:
+        for other in [o for o in self.dispatch['onAnnouncement'] if o != player]:
             other.onAnnouncement(player, announcement)
 
     def get_announcements(self):
-        return [(p, ann) for p, ann in [(Player(p.name, p.index), p.announce()) for p in self.bots] if ann]
+        return [(self.state.players[p.index], ann) for p, ann in [(p, p.announce()) for p in self.dispatch['announce']] if ann]
@@ -167,7 +167,7 @@ class ProxyBot(Bot):
 
     def select(self, players, count):
         self._select = AsyncResult()
-        self.state.count = count
+        self.count = count
         self.expecting = self.process_SELECTED
 
         self.send('SELECT %i!' % (count))
@@ -186,8 +186,8 @@ class ProxyBot(Bot):
             msg = ' '.join(msg[1:])
         team = self.makeTeam(msg)
 
-        if len(team) != self.state.count:
-            self.send('SELECT %i?' % (self.state.count))
+        if len(team) != self.count:
+            self.send('SELECT %i?' % (self.count))
         else:
             assert self._select is not None
             self._select.set(team)
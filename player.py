@@ -20,24 +20,39 @@ class Player(object):
        the details of the Bot class below if you want to write your own AI.
     """
 
+    __slots__ = ['name', 'index', '_hash']
+
     def __init__(self, name, index):
-        # Setup the two member variables first, then continue...
-        self.name = name
-        self.index = index
+        # Setup the two member variables first, then continue...  Players are
+        # immutable, so they're shared by all the bots in a game.
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'index', index)
+        # The index is unique within a game, and unlike the name its hash is
+        # the same in every process so iterating over sets is reproducible.
+        object.__setattr__(self, '_hash', hash(index))
         # This line is necessary for bots using mods as mix-in classes.
         super(Player, self).__init__()
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Player objects are immutable, can't set '%s'." % (name))
+
+    def __delattr__(self, name):
+        raise AttributeError("Player objects are immutable, can't delete '%s'." % (name))
+
+    def __reduce__(self):
+        return (Player, (self.name, self.index))
+
     def __repr__(self):
         return "%i-%s" % (self.index, self.name)
 
     def __eq__(self, other):
-        return self.index == other.index and self.name == other.name
+        return self is other or (self.index == other.index and self.name == other.name)
 
     def __ne__(self, other):
-        return self.index != other.index or self.name != other.name
+        return self is not other and (self.index != other.index or self.name != other.name)
 
     def __hash__(self):
-        return hash(self.index) ^ hash(self.name)
+        return self._hash
 
 
 class Bot(Player):
@@ -63,6 +78,20 @@ class Bot(Player):
 
     __metaclass__ = core.Observable
 
+    # Unlike the players they're given, bots can store anything they need.
+    __setattr__ = object.__setattr__
+    __delattr__ = object.__delattr__
+    __reduce__ = object.__reduce__
+
+    # Bitmask of the spies known to this bot, by index, set before the game
+    # is revealed.  It's zero when playing resistance, see `game.bitmask()`.
+    spiesMask = 0
+
+    # Bots that are given the true roles when a game is played with its oracle
+    # enabled, which is only meant for measurement runs, see `Game`.  Their
+    # `oracle` is then the set of spies, and stays None otherwise.
+    ORACLE = False
+    oracle = None
 
     def onGameRevealed(self, players, spies):
         """This function will be called to list all the players, and if you're
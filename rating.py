@@ -0,0 +1,110 @@
+"""Skill ratings of bots from the outcomes of their games, using a variant of
+TrueSkill for teams.  Each skill is a gaussian with mean `mu`, starting at 25,
+and deviation `sigma`, starting at 25/3; `beta` is the variation of the
+performance in a single game, and `tau` the drift of skills between games.
+
+With `competition.py --rating`, the workers send back the spies, resistance
+and winner of each game, and `CompetitionRunner` updates the ratings in the
+order the games were scheduled.  The ratings then replace the win rates for
+ranking the bots, e.g. to stop adaptive runs or eliminate the last bot.
+"""
+
+import math
+
+
+def pdf(x):
+    return math.exp(-x * x / 2.0) / math.sqrt(2.0 * math.pi)
+
+
+def cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+
+class Rating(object):
+    """Estimated skill of a bot as a gaussian, with mean `mu` and standard
+    deviation `sigma`.  This provides the same interface as util.Variable
+    so it can be used for rankings interchangeably."""
+
+    def __init__(self, mu, sigma):
+        self.mu = mu
+        self.sigma = sigma
+
+    def estimate(self):
+        return self.mu
+
+    def value(self):
+        return self.mu
+
+    def error(self):
+        return 1.96 * self.sigma
+
+    def conservative(self):
+        return self.mu - 3.0 * self.sigma
+
+    def detail(self):
+        return "{:5.2f} (e={:4.2f} mu-3s={:5.2f})".format(self.mu, self.error(), self.conservative())
+
+    def __repr__(self):
+        return "{:5.2f}".format(self.mu)
+
+
+class RatingEngine(object):
+    """Incremental team-based skill ratings, following the TrueSkill update
+    for two teams without draws.  Every game is a match between the spies and
+    the resistance, and each side is also given a rating of its own as a
+    pseudo-player, which absorbs the advantage of playing as spy so the bot
+    ratings don't depend on how often they were assigned each role.
+
+    The skill of bots usually doesn't drift over a competition, so there are
+    no dynamics by default; set `tau` for bots that learn between games."""
+
+    SPIES = '<Spies>'
+    RESISTANCE = '<Resistance>'
+
+    def __init__(self, mu = 25.0, sigma = 25.0 / 3.0, beta = 25.0 / 6.0, tau = 0.0):
+        self.mu = mu
+        self.sigma = sigma
+        self.beta = beta
+        self.tau = tau
+        self.ratings = {}
+
+    def get(self, name):
+        if name not in self.ratings:
+            self.ratings[name] = Rating(self.mu, self.sigma)
+        return self.ratings[name]
+
+    def update(self, spies, resistance, won):
+        """Adjust the ratings after a game between the named spies and the
+        resistance, which `won` if True."""
+        spies = [self.get(n) for n in spies] + [self.get(self.SPIES)]
+        resistance = [self.get(n) for n in resistance] + [self.get(self.RESISTANCE)]
+        winners, losers = (resistance, spies) if won else (spies, resistance)
+
+        players = winners + losers
+        variance = [r.sigma ** 2 + self.tau ** 2 for r in players]
+        c = math.sqrt(sum(variance) + (len(players) - 2) * self.beta ** 2)
+
+        t = (sum([r.mu for r in winners]) - sum([r.mu for r in losers])) / c
+        if t < -30.0:
+            v = -t
+        else:
+            v = pdf(t) / cdf(t)
+        w = v * (v + t)
+
+        # Compute all the changes before applying them, in case the same bot
+        # is playing multiple seats in the game.
+        changes = []
+        for i, r in enumerate(players):
+            sign = 1.0 if i < len(winners) else -1.0
+            mu = r.mu + sign * variance[i] / c * v
+            sigma = math.sqrt(variance[i] * max(1.0 - variance[i] / c ** 2 * w, 1e-4))
+            changes.append((r, mu - r.mu, sigma))
+        for r, delta, sigma in changes:
+            r.mu += delta
+            r.sigma = sigma
+
+    def ranking(self):
+        """Names of the rated bots sorted from best to worst, excluding the
+        pseudo-players for each side."""
+        names = [n for n in self.ratings if n not in (self.SPIES, self.RESISTANCE)]
+        return sorted(names, key = lambda n: self.ratings[n].mu, reverse = True)
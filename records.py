@@ -0,0 +1,245 @@
+"""Compact binary format for recording the games played in competitions.
+
+A file starts with a header listing the names of the bots, and is followed
+by fixed-size records, one per game.  The seats refer to bots by their index
+in the header, and the players in a game are referred to by seat, so teams,
+votes and spies are stored as 5-bit masks.  Each record contains:
+
+    seed        uint64      Random seed the game was played with.
+    number      uint32      Number of the game in the competition schedule.
+    seats       5 x uint8   Index of the bot in each seat.
+    spies       uint8       Mask of the seats playing as spies.
+    won         uint8       1 if the resistance won, 0 otherwise.
+    attempts    uint8       Number of team selections in the game (<= 25).
+    turns       25 x uint8  For each attempt, mission << 3 | tries.
+    teams       25 x uint8  For each attempt, leader << 5 | team mask.
+    votes       25 x uint8  For each attempt, sabotages << 5 | votes mask.
+    retry       uint8       Number of times the game failed and was played
+                            again with another seed, see `competition`.
+
+If the file was created with announcements, each record is followed by 25
+blocks of 5 x 5 bytes, with the spy probability announced by each seat for
+every other seat after each attempt, quantized to 0..254 and 255 if none.
+"""
+
+import os
+import struct
+import itertools
+
+
+MAGIC = b'RSTR'
+VERSION = 1
+
+MAX_ATTEMPTS = 25
+NO_ANNOUNCEMENT = 255
+
+HEADER = struct.Struct('<4sBBHHI')
+RECORD = struct.Struct('<QI5BBBB25s25s25sB')
+ANNOUNCEMENTS = 25 * MAX_ATTEMPTS
+
+
+def recordSize(announcements):
+    return RECORD.size + (ANNOUNCEMENTS if announcements else 0)
+
+
+class Attempt(object):
+    """Everything that happened during a single team selection."""
+
+    __slots__ = ['mission', 'tries', 'leader', 'team', 'votes', 'sabotages', 'announcements']
+
+    def __init__(self, mission, tries, leader):
+        self.mission = mission
+        self.tries = tries
+        self.leader = leader
+        self.team = 0
+        self.votes = 0
+        self.sabotages = 0
+        self.announcements = None
+
+
+class GameRecorder(object):
+    """Collects the events of a game as it's played, indexing players by seat,
+    and packs them into a binary record once the game is complete."""
+
+    def __init__(self, announcements = False):
+        self.announcements = announcements
+        self.attempts = []
+
+    def attempt(self, mission, tries, leader):
+        self.attempts.append(Attempt(mission, tries, leader.index))
+
+    def selected(self, team):
+        self.attempts[-1].team = mask([p.index for p in team])
+
+    def voted(self, votes):
+        self.attempts[-1].votes = mask([i for i, v in enumerate(votes) if v])
+
+    def sabotaged(self, sabotages):
+        self.attempts[-1].sabotages = sabotages
+
+    def announced(self, source, announcement):
+        if not self.announcements:
+            return
+        a = self.attempts[-1]
+        if a.announcements is None:
+            a.announcements = bytearray([NO_ANNOUNCEMENT] * 25)
+        for p, v in announcement.items():
+            a.announcements[source.index * 5 + p.index] = min(max(int(round(v * 254.0)), 0), 254)
+
+    def pack(self, number, seed, ids, spies, won, retry = 0):
+        """Encode the game given the bot index of each seat and the seats of
+        the spies, returning the bytes of the record.  The seed is the one
+        scheduled for the game, even if it was retried with another."""
+        if len(self.attempts) > MAX_ATTEMPTS:
+            raise ValueError("Too many attempts in game #%i to record." % (number))
+        if max(ids) > 255:
+            raise ValueError("Too many bots to record, at most 256 are supported.")
+
+        pad = bytearray(MAX_ATTEMPTS - len(self.attempts))
+        turns = bytearray([a.mission << 3 | a.tries for a in self.attempts]) + pad
+        teams = bytearray([a.leader << 5 | a.team for a in self.attempts]) + pad
+        votes = bytearray([a.sabotages << 5 | a.votes for a in self.attempts]) + pad
+        data = RECORD.pack(seed, number, *(list(ids) + [mask(spies), int(won), len(self.attempts),
+                                                       bytes(turns), bytes(teams), bytes(votes), retry]))
+        if self.announcements:
+            empty = bytearray([NO_ANNOUNCEMENT] * 25)
+            blocks = [a.announcements or empty for a in self.attempts]
+            blocks.extend([empty] * (MAX_ATTEMPTS - len(self.attempts)))
+            data += bytes(bytearray().join(blocks))
+        return data
+
+
+class GameRecord(object):
+    """Decoded version of a binary record, with the bots given by index."""
+
+    def __init__(self, data, announcements = False):
+        fields = RECORD.unpack_from(data)
+        self.seed, self.number = fields[0:2]
+        self.seats = fields[2:7]
+        self.spies = unmask(fields[7])
+        self.won = bool(fields[8])
+        self.retry = fields[13]
+
+        count = fields[9]
+        turns, teams, votes = [bytearray(f) for f in fields[10:13]]
+        self.attempts = []
+        for i in range(count):
+            a = Attempt(turns[i] >> 3, turns[i] & 7, teams[i] >> 5)
+            a.team = unmask(teams[i] & 31)
+            a.votes = [bool(votes[i] & (1 << s)) for s in range(5)]
+            a.sabotages = votes[i] >> 5
+            if announcements:
+                block = bytearray(data[RECORD.size + i * 25:RECORD.size + (i + 1) * 25])
+                a.announcements = dict(((src, dst), block[src * 5 + dst] / 254.0)
+                                        for src in range(5) for dst in range(5)
+                                        if block[src * 5 + dst] != NO_ANNOUNCEMENT)
+            self.attempts.append(a)
+
+
+def mask(seats):
+    m = 0
+    for s in seats:
+        m |= 1 << s
+    return m
+
+
+def unmask(m):
+    return [s for s in range(5) if m & (1 << s)]
+
+
+def readHeader(f):
+    """Parse the header at the start of a file, returning the names of the
+    bots, whether announcements are recorded, and the offset of the data."""
+    magic, version, flags, size, count, offset = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a file of game records in a supported version.")
+    names = []
+    for _ in range(count):
+        length, = struct.unpack('<H', f.read(2))
+        names.append(f.read(length).decode('utf-8'))
+    announcements = bool(flags & 1)
+    assert size == recordSize(announcements)
+    return names, announcements, offset
+
+
+def writeHeader(f, names, announcements):
+    encoded = [n.encode('utf-8') for n in names]
+    offset = HEADER.size + sum([2 + len(n) for n in encoded])
+    f.write(HEADER.pack(MAGIC, VERSION, int(announcements), recordSize(announcements), len(names), offset))
+    for n in encoded:
+        f.write(struct.pack('<H', len(n)) + n)
+
+
+class RecordWriter(object):
+    """Streams game records to a file, buffering them in memory so the disk is
+    only written in large blocks.  If the file already exists with the same
+    bots, the writer continues after the given number of records, dropping
+    any that were written beyond that point; this is used when resuming."""
+
+    BUFFER = 1 << 20
+
+    def __init__(self, filename, names, announcements = False, resume = None):
+        self.size = recordSize(announcements)
+        self.buffer = []
+        self.buffered = 0
+
+        # The sidecar index of the `archive` module is out of date as soon as
+        # records are rewritten, so make sure it's rebuilt.
+        if os.path.exists(filename + '.idx'):
+            os.remove(filename + '.idx')
+
+        if resume is not None:
+            self.file = open(filename, 'r+b')
+            existing, flag, offset = readHeader(self.file)
+            if existing != list(names) or flag != announcements:
+                raise ValueError("Game records in %s are for different bots." % (filename))
+            self.file.seek(offset + resume * self.size)
+            self.file.truncate()
+        else:
+            self.file = open(filename, 'wb')
+            writeHeader(self.file, names, announcements)
+
+    def write(self, data):
+        """Append one or more complete records, as bytes."""
+        assert len(data) % self.size == 0
+        self.buffer.append(data)
+        self.buffered += len(data)
+        if self.buffered >= self.BUFFER:
+            self.flush()
+
+    def flush(self):
+        self.file.write(b''.join(self.buffer))
+        self.file.flush()
+        self.buffer = []
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def count(filename):
+    """Number of complete records stored in a file."""
+    with open(filename, 'rb') as f:
+        names, announcements, offset = readHeader(f)
+        f.seek(0, 2)
+        return (f.tell() - offset) // recordSize(announcements)
+
+
+def read(filename, start = 0, stop = None):
+    """Iterate over all the records in a file, or only those in the given range,
+    returning the names of the bots that the seats refer to as well as the
+    decoded records."""
+    with open(filename, 'rb') as f:
+        names, announcements, offset = readHeader(f)
+    size = recordSize(announcements)
+
+    def records():
+        with open(filename, 'rb') as f:
+            f.seek(offset + start * size)
+            for _ in itertools.count(start) if stop is None else range(start, stop):
+                data = f.read(size)
+                if len(data) < size:
+                    break
+                yield GameRecord(data, announcements)
+    return names, records()
@@ -0,0 +1,184 @@
+"""Replay recorded games for a single bot, driving its callbacks and decisions
+at every step while the game itself follows what was actually played.  Games
+can come from the binary records of competitions, see `records`, or from the
+text transcripts that `master.py` stores in the logs/ folder.
+
+The bot's decisions don't change the course of the game, they're compared
+with what the player in the same seat did; override `onDecision` or inspect
+`ReplayGame.decisions` afterwards.
+"""
+
+import re
+import collections
+
+from player import Player
+from game import BaseGame, bitmask
+import records
+
+
+Decision = collections.namedtuple('Decision', ['phase', 'mission', 'tries', 'chosen', 'played'])
+
+SELECT = 'select'
+VOTE = 'vote'
+SABOTAGE = 'sabotage'
+
+
+class ReplayGame(BaseGame):
+    """Game that plays back a list of recorded attempts, see `records.Attempt`,
+    with the given bot constructor in one of the seats.  If the spies are not
+    known, the bot plays as resistance."""
+
+    def __init__(self, bot, seat, names, attempts, won, spies = None):
+        super(ReplayGame, self).__init__()
+        spy = spies is not None and seat in spies
+        self.bot = bot(self.state, seat, spy)
+
+        names = list(names)
+        names[seat] = self.bot.name
+        self.state.players = [Player(n, i) for i, n in enumerate(names)]
+        self.state.leader = self.next_leader()
+        self.spies = set([self.state.players[s] for s in spies or []])
+        self.known = spies is not None
+
+        self.attempts = attempts
+        self.current = -1
+        self.recorded = won
+        self.decisions = []
+
+    @classmethod
+    def fromRecord(cls, bot, seat, names, record):
+        """Setup a replay of a decoded binary record, `records.GameRecord`,
+        given the bot names from the header of the file."""
+        return cls(bot, seat, [names[i] for i in record.seats], record.attempts, record.won, record.spies)
+
+    @property
+    def attempt(self):
+        return self.attempts[self.current]
+
+    def run(self):
+        while not self.done:
+            self.step()
+        assert self.won == self.recorded, "The replayed game ended differently than it was recorded."
+        self.bot.onGameComplete(self.won, self.spies if self.known else set())
+
+    def onDecision(self, phase, chosen, played):
+        """Called every time the bot makes a decision, along with the decision
+        of the recorded player in its seat, or None if that isn't known."""
+        self.decisions.append(Decision(phase, self.state.turn, self.state.tries, chosen, played))
+
+    def callback(self, name, *args):
+        getattr(self.bot, name)(*args)
+        getattr(self, name)(*args)
+
+    def onGameRevealed(self, players, spies):
+        self.bot.spiesMask = bitmask(self.spies) if self.bot.spy else 0
+        self.bot.onGameRevealed(self.state.players, set(self.spies) if self.bot.spy else set())
+
+    def onMissionAttempt(self, mission, tries, leader):
+        self.current += 1
+        assert (self.attempt.mission, self.attempt.tries) == (mission, tries), "Recorded attempts are out of order."
+        assert self.attempt.leader == leader.index, "Recorded leader does not match the game."
+
+    def get_selection(self, count):
+        team = [self.state.players[s] for s in self.attempt.team]
+        if self.state.leader.index == self.bot.index:
+            selected = self.bot.select(self.state.players, count)
+            self.onDecision(SELECT, set([p.index for p in selected]), set(self.attempt.team))
+        return team
+
+    def get_votes(self):
+        v = self.bot.vote(self.state.team)
+        self.onDecision(VOTE, v, self.attempt.votes[self.bot.index])
+        return list(self.attempt.votes)
+
+    def get_sabotages(self):
+        sabotaged = self.attempt.sabotages
+        if self.bot.spy and self.bot in self.state.team:
+            if sabotaged == 0:
+                played = False
+            elif sabotaged == len([p for p in self.state.team if p in self.spies]):
+                played = True
+            else:
+                played = None
+            self.onDecision(SABOTAGE, self.bot.sabotage(), played)
+        return sabotaged
+
+    def onMissionComplete(self, sabotaged):
+        self.bot.onMissionComplete(sabotaged)
+
+    def get_announcements(self):
+        # The bot's announcement is requested as in a real game, but only the
+        # recorded ones from the other players are passed on.
+        self.bot.announce()
+        announcements = collections.defaultdict(dict)
+        for (source, target), value in (self.attempt.announcements or {}).items():
+            if source != self.bot.index:
+                announcements[source][self.state.players[target]] = value
+        return [(self.state.players[s], a) for s, a in sorted(announcements.items())]
+
+    def onAnnouncement(self, source, announcement):
+        self.bot.onAnnouncement(source, announcement)
+
+
+def replayRecords(filename, bot, name = None):
+    """Iterate over replays of all the games in a file of binary records, with
+    the bot in every seat, or only the seats played by the named bot."""
+    names, games = records.read(filename)
+    for r in games:
+        for seat in range(5):
+            if name is None or names[r.seats[seat]] == name:
+                yield ReplayGame.fromRecord(bot, seat, names, r)
+
+
+RE_PLAYER = re.compile(r"(\d+)-([\w\-]+)")
+RE_ANNOUNCEMENT = re.compile(r"(\d+)-[\w\-]+: ([\d\.]+)")
+
+
+class Transcript(object):
+    """Game parsed from the text transcripts stored by `master.py`, with the
+    same members as `records.GameRecord`.  The spies are not part of the logs,
+    so they're set to None."""
+
+    def __init__(self, lines):
+        self.names = []
+        self.spies = None
+        self.won = None
+        self.attempts = []
+
+        for line in lines:
+            if not line.startswith('> '):
+                continue
+            message = line[2:].rstrip('\n')
+            command = message.split(' ', 1)[0]
+
+            if command == 'REVEAL':
+                self.names = [n for i, n in RE_PLAYER.findall(message)]
+            elif command == 'MISSION':
+                m = re.match(r"MISSION (\d+), TRY (\d+)\. LEADER (\d+)-", message)
+                self.attempts.append(records.Attempt(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+                self.attempts[-1].votes = []
+            elif command == 'SELECTION':
+                self.attempts[-1].team = [int(i) for i, n in RE_PLAYER.findall(message)]
+            elif message.startswith('\t'):
+                self.attempts[-1].votes.append(message.rsplit(':', 1)[1].strip() == 'Yes')
+            elif command == 'SABOTAGED':
+                self.attempts[-1].sabotages = int(message.split(' ')[1].rstrip('.'))
+            elif command == 'ANNOUNCEMENT':
+                source = int(RE_PLAYER.search(message).group(1))
+                mapping = message.split(':', 1)[1]
+                if self.attempts[-1].announcements is None:
+                    self.attempts[-1].announcements = {}
+                for target, value in RE_ANNOUNCEMENT.findall(mapping):
+                    self.attempts[-1].announcements[(source, int(target))] = float(value)
+            elif command == 'RESISTANCE':
+                self.won = True
+            elif command == 'SPIES':
+                self.won = False
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            return cls(f)
+
+    def replay(self, bot, seat):
+        return ReplayGame(bot, seat, self.names, self.attempts, self.won, self.spies)
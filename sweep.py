@@ -0,0 +1,282 @@
+"""Sweep the parameters of a bot over a grid of values, playing the same games
+at every point.  The bot exposes its parameters via a class method, e.g.
+`RandomCheater.cheat_SetRate(res, spy)`, which the workers call before each
+batch of games, so all the points of the grid share one `CompetitionPool`.
+
+Points are yielded as soon as all their games are played, so partial results
+can be shown while the sweep runs, and they're optionally cached on disk by
+the source code of the bots, the parameters and the games played, so sweeps
+that are interrupted or repeated only play the points that are missing.
+
+Rather than spending the same number of games on every point of the grid,
+`AdaptiveSweep` starts from a coarse grid, then plays more rounds of games
+where the confidence intervals are widest and adds points where the surface
+is steepest, until a target error is reached.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import pickle
+import inspect
+import hashlib
+import itertools
+import collections
+
+from competition import CompetitionPool, CompetitionRunner, CompetitionStatistics, COMPETITORS
+from competition import playBatch, batches, gameSeed, unique, timer
+
+
+def grid(*axes):
+    """All the points of a regular grid, given the values along each axis."""
+    return list(itertools.product(*axes))
+
+
+def fingerprint(bots):
+    """Hash of the source files of the bots and their base classes, so cached
+    results are discarded when any of them change."""
+    files = []
+    for bot in bots:
+        for cls in inspect.getmro(bot):
+            try:
+                filename = inspect.getsourcefile(cls)
+            except TypeError:
+                continue
+            if filename and filename not in files:
+                files.append(filename)
+
+    digest = hashlib.sha1()
+    for filename in files:
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def playPoint(task):
+    """Set the parameters of the bot in this worker, then play a batch of
+    games with them."""
+    (point, round, bot, setter, options, games) = task
+    getattr(COMPETITORS[bot], setter)(*point)
+    return (point, round), playBatch((options, games))
+
+
+class SweepRunner(object):
+    """Play the same games for every point of a grid, with the parameters of
+    one bot changed via its `setter` class method.  Statistics are stored by
+    point, in the same format as `CompetitionRunner.statistics`."""
+
+    def __init__(self, bot, setter, competitors, games, batch = 50, seed = 0, schedule = 'random',
+                 cache = None, pool = None, quiet = False, **options):
+        self.bot = bot
+        self.setter = setter
+        # Number of games played at each point, per round.
+        self.games = games
+        self.batch = batch
+        self.seed = seed
+        self.schedule = schedule
+        # Directory where the results of each point are stored, if specified.
+        self.cache = cache
+        self.pool = pool
+        self.quiet = quiet
+        # Options for every game, see `CompetitionRound`.
+        self.options = options
+
+        self.results = collections.OrderedDict()
+        # Number of rounds of games played at each point so far.
+        self.rounds = collections.defaultdict(int)
+        # Number of games actually played, excluding cached rounds.
+        self.played = 0
+        self.fingerprint = fingerprint(competitors)
+        # The seatings and roles are drawn once, and played for every point;
+        # further rounds continue the same schedule.
+        runner = CompetitionRunner(list(competitors), None, schedule = schedule, seed = seed)
+        self.competitors = runner.competitors
+        self.seatings = runner.listGameSelections()
+        self.selections = []
+
+    def key(self, point, round = 0):
+        settings = (self.fingerprint, self.bot.__name__, self.setter, tuple(point),
+                    [bot.__name__ for bot in self.competitors], self.games, self.seed,
+                    self.schedule, sorted(self.options.items()))
+        if round:
+            settings += (round,)
+        return hashlib.sha1(repr(settings).encode('utf-8')).hexdigest()
+
+    def load(self, point, round = 0):
+        if not self.cache:
+            return None
+        filename = os.path.join(self.cache, self.key(point, round) + '.pkl')
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, point, round, statistics):
+        if not self.cache:
+            return
+        if not os.path.isdir(self.cache):
+            os.makedirs(self.cache)
+        filename = os.path.join(self.cache, self.key(point, round) + '.pkl')
+        with open(filename + '.tmp', 'wb') as f:
+            pickle.dump(statistics, f, 2)
+        getattr(os, 'replace', os.rename)(filename + '.tmp', filename)
+
+    def selection(self, round):
+        """Numbers, seatings and roles of the games played in a round."""
+        start = round * self.games
+        while len(self.selections) < start + self.games:
+            self.selections.append(next(self.seatings))
+        return [(start + i, s) for i, s in enumerate(self.selections[start:start + self.games])]
+
+    def tasks(self, points, ids):
+        bot = ids[self.bot]
+        for point, round in points:
+            games = [(i, gameSeed(self.seed, i), tuple(ids[b] for b in players), roles)
+                     for i, (players, roles) in self.selection(round)]
+            for batch in batches(games, self.batch):
+                yield (point, round, bot, self.setter, self.options, batch)
+
+    def merge(self, point, round, statistics):
+        merged = self.results.setdefault(point, {})
+        for name, s in statistics.items():
+            if name not in merged:
+                merged[name] = CompetitionStatistics()
+            merged[name] += s
+        self.rounds[point] = round + 1
+
+    def sweep(self, points):
+        """Play the next round of games for each of the given points, which
+        is the first round for new points, yielding each point along with its
+        merged statistics as soon as it's complete.  Cached points come first,
+        then the others in order."""
+        points = [(tuple(p), self.rounds[tuple(p)]) for p in unique([tuple(p) for p in points])]
+        missing = []
+        for point, round in points:
+            statistics = self.load(point, round)
+            if statistics is None:
+                missing.append((point, round))
+                continue
+            self.merge(point, round, statistics)
+            yield point, self.results[point]
+        if not missing:
+            return
+
+        pool = self.pool or CompetitionPool(self.competitors)
+        ids = dict((bot, pool.index(bot)) for bot in self.competitors)
+        remaining = dict((p, self.games) for p in missing)
+        partial = dict((p, collections.defaultdict(CompetitionStatistics)) for p in missing)
+        try:
+            for (point, round), results in pool.dispatch(playPoint, self.tasks(missing, ids)):
+                for name, s in results.statistics.items():
+                    partial[point, round][name] += s
+                remaining[point, round] -= results.games
+                self.played += results.games
+                if remaining[point, round] == 0:
+                    statistics = dict(partial.pop((point, round)))
+                    self.store(point, round, statistics)
+                    self.merge(point, round, statistics)
+                    yield point, self.results[point]
+        finally:
+            if pool is not self.pool:
+                pool.terminate()
+
+    def main(self, points):
+        start = timer()
+        for point, statistics in self.sweep(points):
+            if not self.quiet:
+                sys.stdout.write('.')
+                sys.stdout.flush()
+        if not self.quiet:
+            print("\nSwept %i points in %0.1fs." % (len(self.results), timer() - start), file=sys.stderr)
+
+    def score(self, point, name):
+        """Spy and resistance win rates of the named bot at a point, along with
+        its total, as in `CompetitionRunner.score()`."""
+        s = self.results[tuple(point)][name]
+        return (s.spyWins.estimate(), s.resWins.estimate(), s.total())
+
+
+class AdaptiveSweep(object):
+    """Refine a sweep where it matters: starting from every `stride`-th value
+    of the axes, points get more rounds of games until the error of their
+    metric is below `target`, and midpoints are added between neighbors on
+    the grid whose values differ by more than `steep`.  The metric is given
+    the runner and a point, and returns its value and error."""
+
+    def __init__(self, runner, axes, metric, stride = 4, target = 0.05, steep = 0.1, width = None, budget = None):
+        self.runner = runner
+        self.axes = [list(a) for a in axes]
+        self.metric = metric
+        self.stride = stride
+        self.target = target
+        self.steep = steep
+        # Maximum number of points that get more games in each iteration.
+        self.width = width
+        # Maximum number of games played in total, across all the points.
+        self.budget = budget
+        self.values = {}
+
+    def point(self, indices):
+        return tuple(a[i] for a, i in zip(self.axes, indices))
+
+    def initial(self):
+        """Indices of the points of the coarse grid, including the last value
+        along each axis."""
+        steps = [sorted(set(list(range(0, len(a), self.stride)) + [len(a) - 1])) for a in self.axes]
+        return list(itertools.product(*steps))
+
+    def refinements(self):
+        """Midpoints between neighbors along each axis of the evaluated grid
+        that differ by more than `steep`, steepest first."""
+        known = set(self.values)
+        candidates = {}
+        for indices in known:
+            for axis in range(len(self.axes)):
+                # Find the next evaluated point along this axis.
+                step = indices[:axis] + (indices[axis] + 1,) + indices[axis+1:]
+                while step[axis] < len(self.axes[axis]) and step not in known:
+                    step = step[:axis] + (step[axis] + 1,) + step[axis+1:]
+                if step not in known or step[axis] - indices[axis] < 2:
+                    continue
+                delta = abs(self.values[step][0] - self.values[indices][0])
+                if delta > self.steep:
+                    middle = indices[:axis] + ((indices[axis] + step[axis]) // 2,) + indices[axis+1:]
+                    candidates[middle] = max(delta, candidates.get(middle, 0.0))
+        return sorted(candidates, key = lambda i: candidates[i], reverse = True)
+
+    def uncertain(self):
+        """Points with an error above the target, widest first."""
+        points = [i for i, (value, error) in self.values.items() if error > self.target]
+        return sorted(points, key = lambda i: self.values[i][1], reverse = True)
+
+    def played(self):
+        """Number of games played so far, not counting those from the cache."""
+        return self.runner.played
+
+    def sweep(self):
+        """Refine the grid until the target error is reached or the budget is
+        spent, yielding each point with its value and error as they change."""
+        pending = self.initial()
+        while pending:
+            if self.budget is not None:
+                pending = pending[:max(0, (self.budget - self.played()) // self.runner.games)]
+                if not pending:
+                    break
+            lookup = dict((self.point(i), i) for i in pending)
+            for point, statistics in self.runner.sweep([self.point(i) for i in pending]):
+                indices = lookup[point]
+                self.values[indices] = self.metric(self.runner, point)
+                yield (point,) + self.values[indices]
+
+            pending = self.refinements() + self.uncertain()[:self.width]
+
+    def main(self):
+        start = timer()
+        for point, value, error in self.sweep():
+            if not self.runner.quiet:
+                sys.stdout.write('.')
+                sys.stdout.flush()
+        if not self.runner.quiet:
+            print("\nRefined %i points with %i games in %0.1fs." % (len(self.values), self.played(), timer() - start),
+                  file=sys.stderr)
@@ -0,0 +1,31 @@
+"""Files of game records shared by the tests of the records and the tools
+that read them."""
+
+import os
+import tempfile
+
+from competition import playBatch
+from records import RecordWriter
+
+
+def recordFile():
+    """Name of a file of records in a new temporary folder."""
+    return os.path.join(tempfile.mkdtemp(), 'games.dat')
+
+
+def record(filename, names, games, announcements = False):
+    """Play the games with the bots of `competition.COMPETITORS`, and write
+    their records to the file, returning the results of the batch."""
+    results = playBatch(({'record': True, 'announcements': announcements}, games))
+    writer = RecordWriter(filename, names, announcements)
+    writer.write(b''.join(results.records))
+    writer.close()
+    return results
+
+
+def removeRecords(filename):
+    """Delete a file of records along with its index and its folder."""
+    for f in [filename, filename + '.idx']:
+        if os.path.exists(f):
+            os.remove(f)
+    os.rmdir(os.path.dirname(filename))
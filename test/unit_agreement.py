@@ -0,0 +1,42 @@
+import unittest
+
+import competition
+from competition import ROLES
+from agreement import evaluate, PHASES
+from replay import SELECT, VOTE
+from bots.beginners import Neighbor, RandomBot
+
+from fixtures import recordFile, record, removeRecords
+
+
+class TestAgreement(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [Neighbor, RandomBot]
+        self.filename = recordFile()
+        games = [(i, i * 11, (0, 1, 1, 1, 1), ROLES[i % len(ROLES)]) for i in range(20)]
+        record(self.filename, ['Neighbor', 'RandomBot'], games)
+
+    def tearDown(self):
+        removeRecords(self.filename)
+
+    def test_Self(self):
+        statistics, decisions = evaluate((self.filename, [0], 'Neighbor', 0, 20))
+        self.assertTrue(decisions > 0)
+        for p in [SELECT, VOTE]:
+            s = statistics[0][p]
+            self.assertTrue(s.played.samples > 0)
+            self.assertEqual(s.played.total, s.played.samples)
+            self.assertEqual(s.winners.samples + s.losers.samples, s.played.samples)
+
+    def test_Range(self):
+        statistics, decisions = evaluate((self.filename, [0, 1], None, 5, 10))
+        self.assertEqual(statistics[1][VOTE].played.samples, statistics[0][VOTE].played.samples)
+        self.assertEqual(sorted(statistics[1].keys()), sorted(PHASES))
+
+        total = sum([s.played.samples for s in statistics[0].values()])
+        self.assertTrue(total > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
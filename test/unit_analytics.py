@@ -0,0 +1,75 @@
+import unittest
+
+import competition
+from competition import ROLES
+from records import read
+
+try:
+    import analytics
+except ImportError:
+    analytics = None
+from bots.beginners import RandomBot, Neighbor
+
+from fixtures import recordFile, record, removeRecords
+
+
+@unittest.skipIf(analytics is None, "NumPy is required for the analytics.")
+class TestAnalytics(unittest.TestCase):
+
+    NAMES = ['RandomBot', 'Neighbor']
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [RandomBot, Neighbor]
+        self.filename = recordFile()
+        games = [(i, i * 7, (0, 1, 0, 1, i % 2), ROLES[i % len(ROLES)]) for i in range(30)]
+        record(self.filename, self.NAMES, games)
+
+    def tearDown(self):
+        removeRecords(self.filename)
+
+    def rows(self):
+        """Same features as `analytics.decisions`, decoded one at a time."""
+        names, games = read(self.filename)
+        for r in games:
+            for a in r.attempts:
+                approved = sum(a.votes) > 2
+                for seat in range(5):
+                    spy = int(seat in r.spies)
+                    yield (r.seats[seat], seat, spy, int(r.won) ^ spy, a.mission, a.tries, int(a.leader == seat),
+                           int(seat in a.team), len(set(a.team) & set(r.spies)), int(a.votes[seat]),
+                           int(approved), a.sabotages if approved else 0)
+
+    def test_Decisions(self):
+        d = analytics.decisions(analytics.GameArchive(self.filename).records)
+        columns = list(zip(*[d[f].tolist() for f in analytics.FEATURES]))
+        self.assertEqual([tuple(int(v) for v in c) for c in columns], list(self.rows()))
+
+    def test_Rates(self):
+        a = analytics.BehaviorAnalytics(self.filename, quiet = True)
+        a.main()
+        rows = [r for r in self.rows() if r[0] == 1 and r[6] and not r[2]]
+        expected = [r[3] for r in rows if r[7]]
+        v = a.rates['selectSelf'].get(1, 1)
+        self.assertEqual((v.total, v.samples), (sum(expected), len(expected)))
+
+    def test_Chunks(self):
+        whole = analytics.BehaviorAnalytics(self.filename, quiet = True)
+        whole.main()
+        parts = analytics.BehaviorAnalytics(self.filename, chunk = 7, quiet = True)
+        parts.main()
+        self.assertEqual(whole.decisions, parts.decisions)
+        for name in whole.rates:
+            self.assertTrue((whole.rates[name].counts == parts.rates[name].counts).all())
+        for name in whole.correlations:
+            self.assertTrue(abs(whole.correlations[name].sums - parts.correlations[name].sums).max() < 1e-9)
+
+    def test_Correlation(self):
+        c = analytics.Correlation(1)
+        x = analytics.numpy.array([0, 1, 0, 1, 1])
+        c.add(analytics.numpy.zeros(5, dtype=int), analytics.numpy.zeros(5, dtype=int), x, x)
+        self.assertAlmostEqual(c.get(0, 0)[0], 1.0)
+        self.assertEqual(c.get(0, 1)[1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import os
+
+import competition
+from competition import ROLES
+from records import RecordWriter, read
+from bots.beginners import RandomBot
+
+from fixtures import recordFile, record, removeRecords
+
+try:
+    import archive
+except ImportError:
+    archive = None
+
+
+@unittest.skipIf(archive is None, "NumPy is required for the archive.")
+class TestGameArchive(unittest.TestCase):
+
+    NAMES = ['RandomBot', 'OtherBot']
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [RandomBot, type('OtherBot', (RandomBot,), {})]
+        self.filename = recordFile()
+        games = [(i, i * 3, (0, 1, 0, 1, i % 2), ROLES[i % len(ROLES)]) for i in range(40)]
+        record(self.filename, self.NAMES, games)
+
+    def tearDown(self):
+        removeRecords(self.filename)
+
+    def test_Fields(self):
+        a = archive.GameArchive(self.filename)
+        names, records = read(self.filename)
+        self.assertEqual(a.names, names)
+        for data, r in zip(a.records, records):
+            self.assertEqual((int(data['number']), int(data['seed'])), (r.number, r.seed))
+            self.assertEqual(tuple(data['seats']), r.seats)
+            self.assertEqual(int(data['attempts']), len(r.attempts))
+            self.assertEqual(bool(data['won']), r.won)
+
+    def test_Query(self):
+        a = archive.GameArchive(self.filename)
+        for b, name in enumerate(self.NAMES):
+            data, seats = a.query(name, spy = True, won = False)
+            for d, s in zip(data, seats):
+                self.assertEqual(d['seats'][s], b)
+                self.assertTrue(d['spies'] & (1 << s))
+                self.assertTrue(d['won'])
+
+        games, seats = a.entries('OtherBot')
+        self.assertEqual(len(games), 40 * 2 + 20)
+        self.assertEqual(sum(a.winrate('RandomBot', spy)[1] for spy in [True, False]), 40 * 2 + 20)
+
+    def test_Selection(self):
+        a = archive.GameArchive(self.filename)
+        picked, total = a.selection('RandomBot', 1, 1)
+        self.assertEqual(total, 40 * 2 + 20)
+        self.assertTrue(0 < picked < total)
+
+    def test_Update(self):
+        archive.GameArchive(self.filename)
+        writer = RecordWriter(self.filename, self.NAMES, resume = 10)
+        writer.close()
+
+        a = archive.GameArchive(self.filename)
+        self.assertEqual(len(a), 10)
+        self.assertEqual(len(a.entries('RandomBot')[0]) + len(a.entries('OtherBot')[0]), 50)
+
+    def test_Rewrite(self):
+        archive.GameArchive(self.filename)
+        with open(self.filename + '.idx', 'rb') as f:
+            index = f.read()
+
+        # Same number of games, but mostly played by the other bot.
+        games = [(i, i * 5, (1, 1, 1, 0, i % 2), ROLES[i % len(ROLES)]) for i in range(40)]
+        record(self.filename, self.NAMES, games)
+        self.assertFalse(os.path.exists(self.filename + '.idx'))
+
+        # Even an index left over from the previous games is rebuilt.
+        with open(self.filename + '.idx', 'wb') as f:
+            f.write(index)
+        a = archive.GameArchive(self.filename)
+        self.assertEqual(len(a.entries('RandomBot')[0]), 40 + 20)
+        self.assertEqual(len(a.entries('OtherBot')[0]), 40 * 3 + 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
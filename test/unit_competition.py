@@ -0,0 +1,291 @@
+import unittest
+
+import os
+import random
+import tempfile
+import collections
+
+import competition
+from competition import CompetitionRunner, CompetitionStatistics, PairwiseStatistics, ROLES, batches, playBatch
+from records import GameRecord
+from util import Variable
+from bots.beginners import RandomBot
+
+
+class TestGameSelections(unittest.TestCase):
+
+    def setUp(self):
+        self.competitors = ['Bot%i' % i for i in range(12)]
+
+    def test_RandomSchedule(self):
+        runner = CompetitionRunner(self.competitors, 100)
+        games = list(runner.listGameSelections())
+        self.assertEqual(len(games), 100)
+        for players, roles in games:
+            self.assertEqual(len(set(players)), 5)
+            self.assertIn(roles, ROLES)
+
+    def test_BalancedSchedule(self):
+        runner = CompetitionRunner(self.competitors, 120, schedule = 'balanced')
+        counts = collections.Counter()
+        for players, roles in runner.listGameSelections():
+            self.assertEqual(len(set(players)), 5)
+            self.assertIn(roles, ROLES)
+            counts.update(players)
+        self.assertEqual(set(counts.values()), set([50]))
+
+    def test_FewCompetitors(self):
+        runner = CompetitionRunner(['A', 'B'], 10)
+        for players, roles in runner.listGameSelections():
+            self.assertEqual(len(players), 5)
+
+    def test_NoCompetitors(self):
+        runner = CompetitionRunner([], 10)
+        self.assertEqual(list(runner.listGameSelections()), [])
+
+
+class TestSeeding(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [RandomBot]
+
+    def test_SeedRange(self):
+        self.assertRaises(ValueError, CompetitionRunner, ['A'], 10, seed = 2**32)
+        self.assertRaises(ValueError, CompetitionRunner, ['A'], 10, seed = -1)
+        self.assertEqual(CompetitionRunner(['A'], 10, seed = 2**32 - 1).seed, 2**32 - 1)
+
+    def test_ScheduleFromSeed(self):
+        a = CompetitionRunner(['Bot%i' % i for i in range(8)], 20, seed = 42)
+        b = CompetitionRunner(['Bot%i' % i for i in range(8)], 20, seed = 42)
+        self.assertEqual(list(a.listGameSelections()), list(b.listGameSelections()))
+
+    def test_GameFromSeed(self):
+        game = (0, competition.gameSeed(42, 7), (0,) * 5, ROLES[3])
+        a, b = playBatch(({}, [game])).statistics, playBatch(({}, [game])).statistics
+        self.assertEqual(a['RandomBot'].total().total, b['RandomBot'].total().total)
+        self.assertEqual(a['RandomBot'].resVoted.total, b['RandomBot'].resVoted.total)
+
+    def test_TrustedSameGame(self):
+        games = [(i, competition.gameSeed(3, i), (0,) * 5, ROLES[i % len(ROLES)]) for i in range(10)]
+        strict = playBatch(({'record': True, 'announcements': True}, games)).records
+        trusted = playBatch(({'record': True, 'announcements': True, 'trusted': True}, games)).records
+        self.assertEqual(strict, trusted)
+
+
+class TestPairwise(unittest.TestCase):
+
+    def test_PairCounts(self):
+        competition.COMPETITORS[:] = [RandomBot]
+        results = playBatch(({'pairwise': True}, [(0, 0, (0,) * 5, ROLES[0])]))
+        matrix = results.pairwise
+        self.assertEqual(matrix.names, ['RandomBot'])
+        self.assertEqual(matrix.rate('spies', 0, 0).samples, 2)
+        self.assertEqual(matrix.rate('resistance', 0, 0).samples, 6)
+        self.assertEqual(matrix.rate('opposed', 0, 0).samples, 12)
+        self.assertEqual(matrix.rate('opposed', 0, 0).total, 6)
+
+    def test_Merge(self):
+        competition.COMPETITORS[:] = [RandomBot]
+        results = playBatch(({'pairwise': True}, [(0, 0, (0,) * 5, ROLES[0])]))
+        results.pairwise += results.pairwise
+        self.assertEqual(results.pairwise.rate('opposed', 0, 0).samples, 24)
+
+    def test_Sparse(self):
+        competition.COMPETITORS[:] = [type('Bot%i' % i, (RandomBot,), {}) for i in range(8)]
+        results = playBatch(({'pairwise': True}, [(0, 0, (1, 2, 3, 4, 5), ROLES[0])]))
+        games = sum([len(results.pairwise.counters[r, 'games']) for r in PairwiseStatistics.RELATIONS])
+        self.assertEqual(games, 20)
+
+        matrix = PairwiseStatistics(results.pairwise.names)
+        matrix += results.pairwise
+        self.assertEqual(len(matrix.counters['opposed', 'games']), 8 * 8)
+        self.assertEqual(matrix.rate('opposed', 1, 2).samples, results.pairwise.rate('opposed', 1, 2).samples)
+        self.assertEqual(sum(matrix.counters['opposed', 'games']), 12)
+
+
+class TestSeparation(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = CompetitionRunner([], 0)
+
+    def sample(self, name, wins, games):
+        s = CompetitionStatistics()
+        s.resWins = Variable(wins, games)
+        self.runner.statistics[name] = s
+
+    def test_Overlapping(self):
+        self.sample('A', 60, 100)
+        self.sample('B', 50, 100)
+        self.sample('C', 10, 100)
+        self.assertFalse(self.runner.separated())
+        self.assertTrue(self.runner.separated(last = True))
+
+    def test_Separated(self):
+        self.sample('A', 900, 1000)
+        self.sample('B', 500, 1000)
+        self.sample('C', 100, 1000)
+        self.assertTrue(self.runner.separated())
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.join(tempfile.mkdtemp(), 'checkpoint.pkl')
+        self.bots = [type(name, (object,), {}) for name in 'ABCDEF']
+
+    def tearDown(self):
+        os.remove(self.filename)
+        os.rmdir(os.path.dirname(self.filename))
+
+    def test_SaveResume(self):
+        runner = CompetitionRunner(self.bots[:5], 100, seed = 7, schedule = 'balanced')
+        runner.played = 40
+        runner.statistics['A'].resWins.sample(1)
+        runner.save(self.filename)
+
+        other = CompetitionRunner(self.bots[:5], 100)
+        other.resume(self.filename)
+        self.assertEqual((other.seed, other.played, other.schedule), (7, 40, 'balanced'))
+        self.assertEqual(other.statistics['A'].resWins.total, 1)
+
+    def test_ResumeRecorded(self):
+        runner = CompetitionRunner(self.bots[:5], 100)
+        runner.played, runner.discarded, runner.recorded = 40, 3, 37
+        runner.save(self.filename)
+
+        other = CompetitionRunner(self.bots[:5], 100)
+        other.resume(self.filename)
+        self.assertEqual((other.played, other.discarded, other.recorded), (40, 3, 37))
+
+    def test_ResumeOtherCompetitors(self):
+        CompetitionRunner(self.bots[:5], 100).save(self.filename)
+        other = CompetitionRunner(self.bots[1:], 100)
+        self.assertRaises(ValueError, other.resume, self.filename)
+
+
+class SyncResult(object):
+
+    def __init__(self, function, args):
+        self.value = function(*args)
+
+    def get(self):
+        return self.value
+
+    def wait(self):
+        pass
+
+
+class SyncPool(object):
+    """Runs the tasks immediately, like `multiprocessing.Pool.apply_async`."""
+
+    def apply_async(self, function, args):
+        return SyncResult(function, args)
+
+
+class TestBatches(unittest.TestCase):
+
+    def test_Batches(self):
+        self.assertEqual(list(batches(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_PlayBatch(self):
+        competition.COMPETITORS[:] = [RandomBot]
+        games = [(i, i, (0,) * 5, roles) for i, roles in enumerate(ROLES)]
+        results = playBatch(({}, games))
+        self.assertEqual(results.games, len(ROLES))
+        self.assertEqual(results.statistics['RandomBot'].total().samples, 5 * len(ROLES))
+        self.assertEqual(len(results.latency), 0)
+
+    def test_PlayBatchTiming(self):
+        competition.COMPETITORS[:] = [RandomBot]
+        results = playBatch(({'timing': True}, [(0, 0, (0,) * 5, ROLES[0])]))
+        calls = results.latency['RandomBot'].calls
+        self.assertEqual(calls['onGameRevealed'].samples, 5)
+        self.assertEqual(calls['onGameComplete'].samples, 5)
+        self.assertTrue(calls['vote'].samples >= 10)
+
+    def test_DispatchPending(self):
+        pending = collections.deque()
+        results = competition.dispatch(SyncPool(), abs, iter([-1, -2, -3, -4, -5]), 3, pending)
+        self.assertEqual([next(results), next(results)], [1, 2])
+        # Stopping early leaves the tasks in flight for the caller to wait on.
+        self.assertEqual([p.get() for p in pending], [3, 4])
+
+
+class FaultyBot(RandomBot):
+
+    def vote(self, team):
+        return {}[team[0]]
+
+
+class InvalidBot(RandomBot):
+
+    def vote(self, team):
+        return 1
+
+
+class FlakyBot(RandomBot):
+
+    def onGameRevealed(self, players, spies):
+        assert random.random() < 0.5
+
+
+class StuckBot(RandomBot):
+
+    def select(self, players, count):
+        while True:
+            pass
+
+
+class TestErrors(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [RandomBot, FaultyBot, InvalidBot, FlakyBot, StuckBot]
+        self.games = [(i, i, (0, 0, 0, 0, 0), ROLES[i % len(ROLES)]) for i in range(10)]
+
+    def batch(self, bot, **options):
+        games = [(n, seed, (0, 0, bot, 0, 0), roles) for n, seed, ids, roles in self.games]
+        return playBatch((options, games))
+
+    def test_Raise(self):
+        self.assertRaises(KeyError, self.batch, 1)
+
+    def test_Discard(self):
+        results = self.batch(1, errors = 'discard')
+        self.assertEqual(dict(results.errors), {('FaultyBot', 'vote'): 10})
+        self.assertEqual((results.games, results.discarded), (10, 10))
+        self.assertEqual(results.examples['FaultyBot', 'vote'][0], 0)
+
+    def test_Validation(self):
+        results = self.batch(2, errors = 'discard')
+        self.assertEqual(list(results.errors.keys()), [('InvalidBot', 'vote')])
+
+    def test_Retry(self):
+        discarded = self.batch(3, errors = 'discard')
+        retried = self.batch(3, errors = 'retry')
+        self.assertEqual(retried.games, 10)
+        self.assertTrue(retried.discarded < discarded.discarded)
+        self.assertTrue(sum(retried.errors.values()) > discarded.discarded)
+
+    def test_RetryRecorded(self):
+        results = self.batch(3, errors = 'retry', record = True)
+        decoded = [GameRecord(r) for r in results.records]
+        self.assertEqual(len(decoded), results.games - results.discarded)
+        self.assertTrue(any([r.retry for r in decoded]))
+        for r in decoded:
+            self.assertEqual(r.seed, self.games[r.number][1])
+
+    @unittest.skipIf(not hasattr(competition.signal, 'setitimer'), "Timeouts require SIGALRM.")
+    def test_Timeout(self):
+        results = self.batch(4, errors = 'discard', timeout = 0.05)
+        self.assertEqual(dict(results.errors), {('StuckBot', 'select'): 10})
+
+    def test_Merge(self):
+        runner = CompetitionRunner([], 0)
+        runner.merge(self.batch(1, errors = 'discard'))
+        runner.merge(self.batch(1, errors = 'discard'))
+        self.assertEqual((runner.played, runner.discarded), (20, 20))
+        self.assertEqual(runner.failures['FaultyBot', 'vote'], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from player import Player
+import configurations as configs
+
+
+class TestConfigurations(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [Player("Mock", i) for i in range(5)]
+
+    def test_All(self):
+        self.assertEqual(len(configs.configurations()), 10)
+        self.assertEqual(len(configs.configurations(5, 2, exclude = 0)), 6)
+        self.assertTrue(all([configs.POPCOUNT[c] == 2 for c in configs.configurations()]))
+
+    def test_Copy(self):
+        a = configs.configurations()
+        a.pop()
+        self.assertEqual(len(configs.configurations()), 10)
+
+    def test_Consistent(self):
+        team = self.players[1:3]
+        all = configs.configurations(5, 2, exclude = 0)
+        self.assertEqual(len(configs.consistent(all, team, 2)), 1)
+        self.assertEqual(len(configs.consistent(all, team, 1)), 6 - 1)
+        self.assertEqual(len(configs.consistent(all, team, 1, optimistic = True)), 4)
+        self.assertEqual(len(configs.clean(all, team)), 1)
+        self.assertEqual(sorted(configs.spiesOnTeam(all, 0b00110)), [0, 1, 1, 1, 1, 2])
+
+    def test_Players(self):
+        self.assertEqual(configs.spiesIn(0b01010, self.players), [self.players[1], self.players[3]])
+        self.assertEqual(len(configs.resistanceIn(0b01010, self.players)), 3)
+
+    def test_Marginals(self):
+        all = configs.configurations(5, 2, exclude = 0)
+        m = configs.marginals(all, self.players)
+        self.assertEqual(m[self.players[0]], 0.0)
+        self.assertAlmostEqual(m[self.players[1]], 0.5)
+        m = configs.marginals([0b00110, 0b01100], self.players, [3.0, 1.0])
+        self.assertAlmostEqual(m[self.players[1]], 0.75)
+        self.assertAlmostEqual(m[self.players[2]], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from player import Bot
+import core
+
+
+class Base(Bot):
+
+    def onMissionAttempt(self, mission, tries, leader):
+        self.calls.append(('Base', mission))
+
+    def onGameRevealed(self, players, spies):
+        self.calls = []
+
+
+class Derived(Base):
+
+    def onMissionAttempt(self, mission, tries, leader):
+        self.calls.append(('Derived', mission))
+
+
+class Mixin(object):
+
+    def onMissionAttempt(self, mission, tries, leader):
+        self.calls.append(('Mixin', mission))
+
+
+class Mixed(Mixin, Derived):
+    pass
+
+
+class Parent(Bot):
+
+    def onGameRevealed(self, players, spies):
+        self.calls = [('Parent', 0)]
+
+    def onMissionAttempt(self, mission, tries, leader):
+        self.calls.append(('Parent', mission))
+
+
+class Child(Parent):
+
+    def onGameRevealed(self, players, spies):
+        super(Child, self).onGameRevealed(players, spies)
+        self.calls.append(('Child', 0))
+
+    def onMissionAttempt(self, mission, tries, leader):
+        super(Child, self).onMissionAttempt(mission, tries, leader)
+        self.calls.append(('Child', mission))
+
+
+class Grandchild(Child):
+
+    def onMissionAttempt(self, mission, tries, leader):
+        super(Grandchild, self).onMissionAttempt(mission, tries, leader)
+        self.calls.append(('Grandchild', mission))
+
+
+@unittest.skipIf(not isinstance(Bot, core.Observable), "The meta-class is only active in Python 2.")
+class TestObservable(unittest.TestCase):
+
+    def create(self, cls):
+        bot = cls(None, 0, False)
+        bot.onGameRevealed([], set())
+        return bot
+
+    def test_Order(self):
+        bot = self.create(Derived)
+        bot.onMissionAttempt(1, 1, None)
+        self.assertEqual(bot.calls, [('Base', 1), ('Derived', 1)])
+
+    def test_Mixin(self):
+        bot = self.create(Mixed)
+        bot.onMissionAttempt(2, 1, None)
+        self.assertEqual(bot.calls, [('Mixin', 2)])
+
+    def test_NoHooks(self):
+        self.assertEqual(Derived.__dict__['onVoteComplete'], Bot.__dict__['onVoteComplete'])
+        self.assertNotEqual(Derived.__dict__['onMissionAttempt'], Bot.__dict__['onMissionAttempt'])
+        self.assertNotIn('onMissionAttempt', Mixed.__compiled__)
+
+
+class TestSuper(unittest.TestCase):
+    """Observers calling the base class explicitly, which works the same with
+    or without the meta-class."""
+
+    def test_Once(self):
+        bot = Grandchild(None, 0, False)
+        bot.onGameRevealed([], set())
+        bot.onMissionAttempt(1, 1, None)
+        bot.onMissionAttempt(2, 1, None)
+        self.assertEqual(bot.calls, [('Parent', 0), ('Child', 0),
+                                     ('Parent', 1), ('Child', 1), ('Grandchild', 1),
+                                     ('Parent', 2), ('Child', 2), ('Grandchild', 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
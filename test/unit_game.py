@@ -1,9 +1,12 @@
 import unittest
 
 import random
+import pickle
 
 from player import Player
-from game import State, BaseGame
+from game import State, BaseGame, Game, implements, bitmask, popcount, overlap
+from bots.beginners import RandomBot, Neighbor
+from bots.cheaters import LogicalCheater
 
 
 class FakeGame(BaseGame):
@@ -175,5 +178,124 @@ class TestAnnouncements(unittest.TestCase):
         self.assertEquals(self.game.state.leader, self.game.state.players[1])
 
 
+class TestPlayers(unittest.TestCase):
+
+    def test_Immutable(self):
+        p = Player("Mock", 1)
+        self.assertRaises(AttributeError, setattr, p, 'index', 2)
+        self.assertRaises(AttributeError, setattr, p, 'spy', True)
+        self.assertEquals(p.index, 1)
+
+    def test_Equality(self):
+        p, q = Player("Mock", 1), Player("Mock", 1)
+        self.assertEquals(p, q)
+        self.assertEquals(hash(p), hash(q))
+        self.assertNotEqual(p, Player("Mock", 2))
+        self.assertNotEqual(p, Player("Other", 1))
+        self.assertEquals(pickle.loads(pickle.dumps(p)), p)
+
+    def test_Shared(self):
+        game = Game([RandomBot] * 5, [True, True, False, False, False])
+        game.run()
+        players = game.state.players
+        self.assertTrue(all([p is players[p.index] for p in game.spies]))
+        self.assertTrue(all([p is players[p.index] for p in game.state.team]))
+        self.assertEquals(game.bots[0], players[0])
+
+
+class TestState(unittest.TestCase):
+
+    def setUp(self):
+        self.game = FakeGame([('selection', [Player("Mock", 1), Player("Mock", 3)]),
+                              ('votes', [True, False, True, True, False])])
+        self.game.step(3)
+
+    def test_Masks(self):
+        state = self.game.state
+        self.assertEquals(state.teamMask, 0b01010)
+        self.assertEquals(state.votesMask, 0b01101)
+        self.assertEquals(state.leaderIndex, 0)
+        self.assertTrue(state.inTeam(Player("Mock", 3)))
+        self.assertFalse(state.votedFor(Player("Mock", 1)))
+        self.assertEquals(state.spiesOnTeam(0b00110), 1)
+        state.team = None
+        self.assertEquals(state.teamMask, None)
+
+    def test_Helpers(self):
+        self.assertEquals(bitmask([Player("Mock", 0), Player("Mock", 4)]), 0b10001)
+        self.assertEquals(popcount(0b10110), 3)
+        self.assertEquals(overlap(0b10110, 0b00111), 2)
+
+    def test_SpiesMask(self):
+        game = Game([RandomBot] * 5, [True, False, False, True, False])
+        game.step()
+        self.assertEquals([b.spiesMask for b in game.bots], [0b01001, 0, 0, 0b01001, 0])
+
+    def test_Snapshot(self):
+        state = self.game.state
+        snapshot = state.snapshot()
+        copy = State.fromSnapshot(snapshot)
+        self.assertEquals(copy, state)
+        self.assertEquals(copy.team, state.team)
+        self.assertEquals(copy.votes, state.votes)
+
+        state.wins += 1
+        state.team = None
+        self.assertNotEqual(copy, state)
+        state.restore(snapshot)
+        self.assertEquals(copy, state)
+
+    def test_Clone(self):
+        state = self.game.state
+        clone = state.clone()
+        self.assertEquals(clone, state)
+        clone.votes = [False] * 5
+        self.assertNotEqual(clone, state)
+        self.assertEquals(state.votesMask, 0b01101)
+
+
+class TestDispatch(unittest.TestCase):
+
+    def test_Implements(self):
+        game = Game([RandomBot, Neighbor, RandomBot, Neighbor, Neighbor], [True, True, False, False, False])
+        self.assertEquals(game.dispatch['announce'], [game.bots[0], game.bots[2]])
+        self.assertEquals(game.dispatch['onVoteComplete'], [])
+        self.assertFalse(implements(game.bots[1], 'announce'))
+
+    def test_Instance(self):
+        game = Game([Neighbor] * 5, [True, True, False, False, False])
+        calls = []
+        game.bots[3].onMissionComplete = lambda sabotaged: calls.append(sabotaged)
+        game.setupDispatch()
+        game.run()
+        self.assertEquals(len(calls), game.state.wins + game.state.losses)
+
+
+class OracleBot(RandomBot):
+    ORACLE = True
+
+
+class TestOracle(unittest.TestCase):
+
+    def test_Disabled(self):
+        game = Game([OracleBot] * 5, [True, True, False, False, False])
+        game.run()
+        self.assertTrue(all([b.oracle is None for b in game.bots]))
+
+    def test_Enabled(self):
+        game = Game([OracleBot, RandomBot, OracleBot, RandomBot, RandomBot], [False, True, False, True, False], oracle=True)
+        game.run()
+        self.assertEquals(game.bots[0].oracle, game.spies)
+        self.assertEquals(game.bots[2].oracle, set([game.state.players[1], game.state.players[3]]))
+        self.assertEquals(game.bots[1].oracle, None)
+
+    def test_LogicalCheater(self):
+        for roles in [[True, True, False, False, False], [False, True, False, True, False]]:
+            game = Game([LogicalCheater, RandomBot, LogicalCheater, RandomBot, RandomBot], roles, oracle=True)
+            game.run()
+            self.assertEquals(game.bots[0].spies, game.spies)
+            self.assertTrue(hasattr(game.bots[2], 'configurations'))
+
+
 if __name__ == "__main__":
     unittest.main()
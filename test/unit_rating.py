@@ -0,0 +1,46 @@
+import unittest
+
+import random
+
+from rating import RatingEngine
+
+
+class TestRatingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = RatingEngine()
+
+    def test_Defaults(self):
+        r = self.engine.get('A')
+        self.assertEqual(r.mu, self.engine.mu)
+        self.assertEqual(r.sigma, self.engine.sigma)
+
+    def test_Winners(self):
+        self.engine.update(['A', 'B'], ['C', 'D', 'E'], True)
+        for n in 'CDE':
+            self.assertTrue(self.engine.get(n).mu > self.engine.mu)
+            self.assertTrue(self.engine.get(n).sigma < self.engine.sigma)
+        for n in 'AB':
+            self.assertTrue(self.engine.get(n).mu < self.engine.mu)
+
+    def test_Ranking(self):
+        # Bot A is much stronger, bot E much weaker, the others are equal.
+        skill = {'A': 0.8, 'B': 0.5, 'C': 0.5, 'D': 0.5, 'E': 0.2}
+        rng = random.Random(0)
+        for _ in range(2000):
+            names = list(skill)
+            rng.shuffle(names)
+            spies, resistance = names[:2], names[2:]
+            s = sum([skill[n] for n in spies]) / 2.0
+            r = sum([skill[n] for n in resistance]) / 3.0
+            won = rng.random() < 0.5 + r - s
+            self.engine.update(spies, resistance, won)
+
+        ranking = self.engine.ranking()
+        self.assertEqual(ranking[0], 'A')
+        self.assertEqual(ranking[-1], 'E')
+        self.assertNotIn(RatingEngine.SPIES, ranking)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import competition
+from competition import ROLES, playBatch
+from records import GameRecord, RecordWriter, read, recordSize
+from bots.beginners import RandomBot
+
+from fixtures import recordFile, record, removeRecords
+
+
+class TestGameRecords(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [RandomBot]
+        self.filename = recordFile()
+
+    def tearDown(self):
+        removeRecords(self.filename)
+
+    def games(self, count):
+        return [(i, i * 7, (0,) * 5, ROLES[i % len(ROLES)]) for i in range(count)]
+
+    def test_Record(self):
+        results = playBatch(({'record': True}, self.games(1)))
+        self.assertEqual(len(results.records), 1)
+        self.assertEqual(len(results.records[0]), recordSize(False))
+
+        r = GameRecord(results.records[0])
+        self.assertEqual((r.number, r.seed, r.seats), (0, 0, (0,) * 5))
+        self.assertEqual(r.spies, [i for i, spy in enumerate(ROLES[0]) if spy])
+        self.assertEqual(r.won, results.statistics['RandomBot'].resWins.total > 0)
+
+        self.assertEqual((r.attempts[0].mission, r.attempts[0].tries, r.attempts[0].leader), (1, 1, 0))
+        for a in r.attempts:
+            self.assertEqual(len(a.team), [2, 3, 2, 3, 3][a.mission-1])
+            if sum(a.votes) < 3:
+                self.assertEqual(a.sabotages, 0)
+
+    def test_WriteRead(self):
+        record(self.filename, ['RandomBot'], self.games(20), announcements = True)
+        names, records = read(self.filename)
+        self.assertEqual(names, ['RandomBot'])
+        self.assertEqual([r.number for r in records], list(range(20)))
+
+    def test_Resume(self):
+        results = record(self.filename, ['RandomBot'], self.games(10))
+        writer = RecordWriter(self.filename, ['RandomBot'], resume = 4)
+        writer.write(b''.join(results.records[4:6]))
+        writer.close()
+
+        names, records = read(self.filename)
+        self.assertEqual([r.number for r in records], list(range(6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import competition
+from competition import ROLES, playBatch
+from records import GameRecord
+from replay import ReplayGame, Transcript, replayRecords, SELECT, VOTE, SABOTAGE
+from bots.beginners import Neighbor, RandomBot
+
+from fixtures import recordFile, record, removeRecords
+
+
+TRANSCRIPT = """\
+> REVEAL [0-Alice, 1-Bob, 2-Carol, 3-Dave, 4-Eve]
+> MISSION 1, TRY 1. LEADER 0-Alice!
+> SELECTION [0-Alice, 1-Bob].
+> VOTED +1.
+> \t0-Alice: Yes
+> \t1-Bob: Yes
+> \t2-Carol: No
+> \t3-Dave: Yes
+> \t4-Eve: No
+> SABOTAGED 1.
+> ANNOUNCEMENT from 2-Carol: {0-Alice: 0.5, 1-Bob: 0.75}
+[Carol] I knew it!
+> MISSION 2, TRY 1. LEADER 1-Bob!
+> SELECTION [1-Bob, 2-Carol, 3-Dave].
+> VOTED -5.
+> \t0-Alice: No
+> \t1-Bob: No
+> \t2-Carol: No
+> \t3-Dave: No
+> \t4-Eve: No
+> SPIES WIN...
+"""
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = [Neighbor, RandomBot]
+
+    def play(self, count):
+        games = [(i, i * 5, (0, 1, 1, 1, 1), ROLES[i % len(ROLES)]) for i in range(count)]
+        return [GameRecord(data) for data in playBatch(({'record': True}, games)).records]
+
+    def test_Deterministic(self):
+        names = ['Neighbor', 'RandomBot']
+        for r in self.play(20):
+            game = ReplayGame.fromRecord(Neighbor, 0, names, r)
+            game.run()
+
+            phases = set([d.phase for d in game.decisions])
+            self.assertIn(VOTE, phases)
+            self.assertEqual(len([d for d in game.decisions if d.phase == VOTE]), len(r.attempts))
+            for d in game.decisions:
+                if d.played is not None:
+                    self.assertEqual(d.chosen, d.played)
+
+    def test_OtherSeat(self):
+        names = ['Neighbor', 'RandomBot']
+        for r in self.play(5):
+            game = ReplayGame.fromRecord(Neighbor, 3, names, r)
+            game.run()
+            self.assertEqual(game.state.players[3].name, 'Neighbor')
+            self.assertEqual(game.bot.spy, 3 in r.spies)
+            for d in game.decisions:
+                if d.phase == SABOTAGE:
+                    self.assertTrue(game.bot.spy)
+
+    def test_File(self):
+        filename = recordFile()
+        try:
+            record(filename, ['Neighbor', 'RandomBot'], [(0, 1, (0, 1, 1, 0, 1), ROLES[0])])
+            self.assertEqual(len(list(replayRecords(filename, Neighbor))), 5)
+            self.assertEqual(len(list(replayRecords(filename, Neighbor, name = 'Neighbor'))), 2)
+        finally:
+            removeRecords(filename)
+
+    def test_Transcript(self):
+        t = Transcript(TRANSCRIPT.splitlines(True))
+        self.assertEqual(t.names, ['Alice', 'Bob', 'Carol', 'Dave', 'Eve'])
+        self.assertEqual([(a.mission, a.tries, a.leader) for a in t.attempts], [(1, 1, 0), (2, 1, 1)])
+        self.assertEqual(t.attempts[0].votes, [True, True, False, True, False])
+        self.assertEqual(t.attempts[0].announcements, {(2, 0): 0.5, (2, 1): 0.75})
+        self.assertFalse(t.won)
+
+    def test_TranscriptReplay(self):
+        t = Transcript(TRANSCRIPT.splitlines(True))
+        game = t.replay(Neighbor, 0)
+        self.assertFalse(game.bot.spy)
+        for _ in range(4):
+            game.step()
+        self.assertEqual([d.phase for d in game.decisions], [SELECT, VOTE])
+        self.assertEqual(game.decisions[0].chosen, set([0, 1]))
+        self.assertEqual(game.state.losses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+
+import shutil
+import tempfile
+
+import competition
+from sweep import SweepRunner, AdaptiveSweep, grid, fingerprint, playPoint
+from bots.beginners import RandomBot, Neighbor
+
+
+class TunedBot(RandomBot):
+
+    rate = None
+
+    @classmethod
+    def setRate(cls, *rate):
+        cls.rate = rate
+
+
+class LocalPool(object):
+    """Plays the tasks in this process, in order, like `CompetitionPool`."""
+
+    competitors = [TunedBot, Neighbor]
+
+    def index(self, bot):
+        return self.competitors.index(bot)
+
+    def dispatch(self, function, tasks):
+        return (function(t) for t in tasks)
+
+
+class IdlePool(LocalPool):
+
+    def dispatch(self, function, tasks):
+        raise AssertionError("All the points should have been cached.")
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = LocalPool.competitors
+        self.cache = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache)
+
+    def runner(self, pool, **options):
+        return SweepRunner(TunedBot, 'setRate', [TunedBot, Neighbor], 12, batch = 5,
+                           cache = self.cache, pool = pool, quiet = True, **options)
+
+    def test_Grid(self):
+        self.assertEqual(grid([1, 2], [3]), [(1, 3), (2, 3)])
+
+    def test_Parameters(self):
+        game = (0, 0, (0, 1, 1, 1, 1), competition.ROLES[0])
+        point, results = playPoint(((0.25,), 0, 0, 'setRate', {}, [game]))
+        self.assertEqual(TunedBot.rate, (0.25,))
+        self.assertEqual(results.games, 1)
+
+    def test_Sweep(self):
+        runner = self.runner(LocalPool())
+        points = [p for p, s in runner.sweep([(0.1,), (0.2,), (0.3,)])]
+        self.assertEqual(points, [(0.1,), (0.2,), (0.3,)])
+        for p in points:
+            total = runner.results[p]['TunedBot'].total().samples + runner.results[p]['Neighbor'].total().samples
+            self.assertEqual(total, 12 * 5)
+
+    def test_Cache(self):
+        first = self.runner(LocalPool())
+        first.main([(0.1,), (0.2,)])
+        second = self.runner(IdlePool())
+        second.main([(0.2,), (0.1,)])
+        self.assertEqual((first.played, second.played), (12 * 2, 0))
+        for p in [(0.1,), (0.2,)]:
+            self.assertEqual(first.score(p, 'TunedBot')[:2], second.score(p, 'TunedBot')[:2])
+            self.assertEqual(first.score(p, 'TunedBot')[2].samples, second.score(p, 'TunedBot')[2].samples)
+
+    def test_Key(self):
+        runner = self.runner(LocalPool())
+        self.assertNotEqual(runner.key((0.1,)), runner.key((0.2,)))
+        self.assertNotEqual(runner.key((0.1,)), self.runner(LocalPool(), trusted = True).key((0.1,)))
+        self.assertEqual(fingerprint([TunedBot]), fingerprint([TunedBot, TunedBot]))
+
+
+def threshold(runner, point):
+    """Step in the middle of the axis, with an error that halves every round."""
+    return (float(point[0] >= 0.55), 0.2 / runner.rounds[point])
+
+
+class TestAdaptiveSweep(unittest.TestCase):
+
+    def setUp(self):
+        competition.COMPETITORS[:] = LocalPool.competitors
+
+    def runner(self, **options):
+        return SweepRunner(TunedBot, 'setRate', [TunedBot, Neighbor], 5, pool = LocalPool(), quiet = True, **options)
+
+    def test_Refine(self):
+        sweep = AdaptiveSweep(self.runner(), [[i / 10.0 for i in range(9)]], threshold, stride = 4, target = 0.5)
+        sweep.main()
+        # Points are only added around the step, until they're adjacent.
+        self.assertEqual(sorted(sweep.values), [(0,), (4,), (5,), (6,), (8,)])
+
+    def test_Target(self):
+        runner = self.runner()
+        sweep = AdaptiveSweep(runner, [[0.0, 1.0], [0.0, 1.0]], threshold, target = 0.06, steep = 2.0)
+        sweep.main()
+        self.assertEqual(set(runner.rounds.values()), set([4]))
+        self.assertTrue(all([e <= 0.06 for v, e in sweep.values.values()]))
+
+    def test_Budget(self):
+        runner = self.runner()
+        sweep = AdaptiveSweep(runner, [[0.0, 1.0], [0.0, 1.0]], threshold, target = 0.0, steep = 2.0, budget = 50)
+        sweep.main()
+        self.assertEqual(sweep.played(), 50)
+
+    def test_CachedBudget(self):
+        cache = tempfile.mkdtemp()
+        try:
+            axes = [[0.0, 1.0], [0.0, 1.0]]
+            AdaptiveSweep(self.runner(cache = cache), axes, threshold, target = 0.0, steep = 2.0, budget = 40).main()
+            # The cached rounds don't count against the budget of the next run.
+            runner = self.runner(cache = cache)
+            sweep = AdaptiveSweep(runner, axes, threshold, target = 0.0, steep = 2.0, budget = 40)
+            sweep.main()
+            self.assertEqual(sweep.played(), 40)
+            self.assertEqual(set(runner.rounds.values()), set([4]))
+        finally:
+            shutil.rmtree(cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,58 +1,99 @@
 #!/usr/bin/python2.7 -u
-import itertools
+"""Measure the performance of a resistance AI against cheating bots of known
+skill, over a grid of skill levels for the spies and resistance.  All the
+points share one pool of workers, and are cached in the cache/ folder.  With
+--adaptive, games are only spent where the surface is uncertain or steep."""
+
+from __future__ import print_function
+
+import math
+import argparse
 import multiprocessing
 
-from competition import CompetitionRunner
+from sweep import SweepRunner, AdaptiveSweep, grid
 
 from bots.cheaters import RandomCheater
 from sceptic import ScepticBot
 
 
-def main(arg):
-    print '.',
-    res, spy = arg
-    RandomCheater.cheat_SetRate(float(res) / 10.0, float(spy) / 10.0)
+# Skill levels of the cheaters, from 0.0 to 1.0 for both roles.
+LEVELS = [i / 10.0 for i in range(11)]
 
-    # Score of this bot is calculated relative to the scores of all these other bots.
-    competitors = [ScepticBot, RandomCheater, RandomCheater, RandomCheater, RandomCheater]
-    runner = CompetitionRunner(competitors, 250, quiet = True)
-    runner.main()
 
+def improvement(runner, point):
+    """Difference in resistance win rates, and its error."""
     # TODO: Split the evaluation depending on whether the bot is Spy or Resistance.
-    return (res, spy), runner.score('ScepticBot')[1] - runner.score('RandomCheater')[1]
+    bot, cheater = runner.results[point]['ScepticBot'].resWins, runner.results[point]['RandomCheater'].resWins
+    return bot.estimate() - cheater.estimate(), math.sqrt(bot.error() ** 2 + cheater.error() ** 2)
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Sweep the skill of cheating bots against a resistance AI.")
+    parser.add_argument('--games', type=int, default=250,
+                help = "Number of games played for each skill level, per round.")
+    parser.add_argument('--cache', type=str, default='cache',
+                help = "Folder where the results of each skill level are stored.")
+    parser.add_argument('--adaptive', action='store_true',
+                help = "Refine a coarse grid where it's uncertain or steep, instead of playing every point.")
+    parser.add_argument('--target', type=float, default=0.05,
+                help = "Error of the improvement at which adaptive refinement stops.")
+    parser.add_argument('--budget', type=int, default=None,
+                help = "Maximum number of games played for adaptive refinement.")
+    args = parser.parse_args()
+
     from mpl_toolkits.mplot3d import Axes3D
     import matplotlib.pyplot as plt
     from matplotlib import cm
     import numpy as np
 
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
-
-    print "Measuring performance of Resistance AI (SkepticBot) against bots of exact skill."
-    print " - 10 total skill levels for spy and resistance."
-    print " - 121 jobs run in total, for 250 games each."
-    print " - Using %i threads to run the evaluations...\n" % multiprocessing.cpu_count()
+    print("Measuring performance of Resistance AI (SkepticBot) against bots of exact skill.")
+    print(" - 11 total skill levels for spy and resistance.")
+    if args.adaptive:
+        print(" - Refining a coarse grid, %i games at a time, to an error of %0.2f." % (args.games, args.target))
+    else:
+        print(" - 121 points evaluated in total, for %i games each." % (args.games))
+    print(" - Using %i processes to run the evaluations...\n" % multiprocessing.cpu_count())
 
-    pool = multiprocessing.Pool(processes=multiprocessing.cpu_count())
-    results = {}
-    for i, t in pool.map(main, itertools.product(range(11), range(11))):
-        results[i] = float(t)
-
-    X, Y = np.meshgrid(range(11), range(11))
-    zs = np.array([results[(x,y)] for x,y in zip(np.ravel(X), np.ravel(Y))])
-    Z = zs.reshape(X.shape)
-
-    ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap=cm.jet, linewidth=1, antialiased=True)
-
-    ax.set_xlabel('Resistance Skill')
-    ax.set_xticklabels(['r=%1.1f' % (float(i*2)/10.0) for i in range(6)])
-    ax.set_ylabel('Spy Skill')
-    ax.set_yticklabels(['s=%1.1f' % (float(i*2)/10.0) for i in range(6)])
-    ax.set_zlabel('Improvement')
+    # Score of this bot is calculated relative to the scores of all these other bots.
+    competitors = [ScepticBot, RandomCheater, RandomCheater, RandomCheater, RandomCheater]
+    runner = SweepRunner(RandomCheater, 'cheat_SetRate', competitors, args.games, cache = args.cache, oracle = True)
 
-    print "\n\nShowing performance graph of the evaluated bot relative to its opponents."
+    plt.ion()
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    values = {}
+
+    def draw():
+        ax.clear()
+        if args.adaptive:
+            # Only some of the points are evaluated, so triangulate between them.
+            res, spy = zip(*values.keys())
+            ax.plot_trisurf(res, spy, list(values.values()), cmap=cm.jet, linewidth=1, antialiased=True)
+        else:
+            X, Y = np.meshgrid(LEVELS, LEVELS)
+            Z = np.array([values.get((x, y), np.nan) for x, y in zip(np.ravel(X), np.ravel(Y))]).reshape(X.shape)
+            ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap=cm.jet, linewidth=1, antialiased=True)
+        ax.set_xlabel('Resistance Skill')
+        ax.set_ylabel('Spy Skill')
+        ax.set_zlabel('Improvement')
+        plt.pause(0.001)
+
+    if args.adaptive:
+        sweep = AdaptiveSweep(runner, [LEVELS, LEVELS], improvement, target = args.target, budget = args.budget)
+        points = ((point, value) for point, value, error in sweep.sweep())
+    else:
+        points = ((point, improvement(runner, point)[0]) for point, statistics in runner.sweep(grid(LEVELS, LEVELS)))
+
+    # Redraw the partial surface after every row's worth of skill levels.
+    for i, (point, value) in enumerate(points):
+        values[point] = value
+        print('.', end='')
+        if (i + 1) % len(LEVELS) == 0:
+            draw()
+
+    draw()
+    if args.adaptive:
+        print("\n\nPlayed %i games for %i skill levels." % (sweep.played(), len(values)))
+    print("\n\nShowing performance graph of the evaluated bot relative to its opponents.")
+    plt.ioff()
     plt.show()
-
@@ -0,0 +1,33 @@
+#!/usr/bin/python2.7 -u
+"""Measure how many games per second are played in a single process, with
+the strict validation of the bots' decisions and in trusted mode."""
+
+from __future__ import print_function
+
+import argparse
+import itertools
+
+from competition import CompetitionRunner, getCompetitors, playGame, gameSeed, timer
+
+
+def measure(schedule, seed, **options):
+    start = timer()
+    for i, (players, roles) in enumerate(schedule):
+        playGame(players, roles, gameSeed(seed, i), **options)
+    return len(schedule) / (timer() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Benchmark the game engine in strict and trusted modes.")
+    parser.add_argument('games', type=int)
+    parser.add_argument('bots', nargs='+')
+    parser.add_argument('--repeat', type=int, default=3,
+                help = "Number of measurements, of which the best is kept.")
+    args = parser.parse_args()
+
+    runner = CompetitionRunner(getCompetitors(args.bots), args.games, seed = 0)
+    schedule = list(itertools.islice(runner.listGameSelections(), args.games))
+
+    for mode, trusted in [('strict', False), ('trusted', True)]:
+        rate = max([measure(schedule, runner.seed, trusted = trusted) for _ in range(args.repeat)])
+        print('{0:<8s}'.format(mode), "%8.1f games/sec" % (rate))
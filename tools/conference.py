@@ -1,7 +1,7 @@
 import sys
 from time import time
 import itertools
-from competition import CompetitionRunner, getCompetitors
+from competition import CompetitionRunner, CompetitionPool, getCompetitors
 
 
 if __name__ == '__main__':
@@ -14,13 +14,15 @@ if __name__ == '__main__':
                                 'aigd.Statistician', 'aigd.LogicalBot'])
     
     pool = competitors + opponents
+    # Workers are started and bots imported once for all elimination rounds.
+    workers = CompetitionPool(pool)
     rnd = 1
     while len(pool) >= 5:
         r = int(sys.argv[1])
         if len(pool) == 5:
-            runner = CompetitionRunner(pool, rounds = int(r * 2.5), quiet = False)
+            runner = CompetitionRunner(pool, rounds = int(r * 2.5), quiet = False, pool = workers)
         else:
-            runner = CompetitionRunner(pool, rounds = r, quiet = True)
+            runner = CompetitionRunner(pool, rounds = r, quiet = True, pool = workers, adaptive = 'last', rating = True)
         runner.main()
     
         if len(pool) == 5:
@@ -28,7 +30,7 @@ if __name__ == '__main__':
             break
         else:
             last, other = runner.last()
-            print "ROUND #%i: Eliminated %s." % (rnd, last[0].__name__),
+            print "ROUND #%i: Eliminated %s after %i games." % (rnd, last[0].__name__, runner.played),
             if last[1].estimate() + last[1].error() < other[1].estimate()     \
             and other[1].estimate() + other[1].error() > last[1].estimate():
                 print "(approved)"
@@ -38,3 +40,4 @@ if __name__ == '__main__':
             pool.remove(last[0])
         rnd += 1
 
+    workers.close()
@@ -0,0 +1,41 @@
+#!/usr/bin/python2.7 -u
+"""Microbenchmark of filtering the spy configurations after a mission, the
+most frequent operation of the logical bots, comparing the comprehensions
+over bitmasks of `configurations` with the same filters vectorized over a
+NumPy boolean matrix of configurations."""
+
+from __future__ import print_function
+
+import timeit
+import itertools
+
+import numpy
+
+import configurations as configs
+
+
+def matrix(players, spies):
+    """Boolean matrix with one row per configuration and one column per seat."""
+    rows = [[i in c for i in range(players)] for c in itertools.combinations(range(players), spies)]
+    return numpy.array(rows, dtype=bool)
+
+
+def consistent(rows, team, sabotaged, optimistic = False):
+    """Same as `configurations.consistent`, for rows of a boolean matrix."""
+    counts = rows[:, team].sum(axis=1)
+    return rows[counts == sabotaged] if optimistic else rows[counts >= sabotaged]
+
+
+def measure(function, number = 20000):
+    best = min(timeit.repeat(function, number = number, repeat = 5))
+    return best / number * 1e9
+
+
+if __name__ == '__main__':
+    for players, spies in [(5, 2), (7, 3), (10, 4)]:
+        masks, rows = configs.configurations(players, spies), matrix(players, spies)
+        team = list(range(spies + 1))
+        mask = sum([1 << i for i in team])
+        print('{0:>2d} players, {1:>3d} configurations'.format(players, len(masks)),
+              "  bitmasks %6.0f ns" % measure(lambda: configs.consistent(masks, mask, 1)),
+              "  numpy %6.0f ns" % measure(lambda: consistent(rows, team, 1)))
@@ -0,0 +1,50 @@
+#!/usr/bin/python2.7 -u
+"""Microbenchmark of the overhead of calling the observers of bots, comparing
+the precompiled chains of `core.Observable` with walking the base classes on
+every call as it used to be done."""
+
+from __future__ import print_function
+
+import timeit
+
+from player import Bot
+
+
+class Base(Bot):
+    def onMissionAttempt(self, mission, tries, leader):
+        pass
+
+class Derived(Base):
+    def onMissionAttempt(self, mission, tries, leader):
+        pass
+
+
+def walk(name, function):
+    def wrap(self, *args, **kwargs):
+        for c in reversed(self.__class__.__mro__):
+            if hasattr(c, '__hooks__'):
+                for m in c.__hooks__.get(name, []):
+                    m(self, *args, **kwargs)
+        return function(self, *args, **kwargs)
+    return wrap
+
+
+class Walked(Derived):
+    pass
+
+for k, f in Bot.__events__.items():
+    setattr(Walked, k, walk(k, f))
+
+
+def measure(bot, name, number = 200000):
+    call = getattr(bot, name)
+    best = min(timeit.repeat(lambda: call(1, 1, None) if name == 'onMissionAttempt' else call([True] * 5),
+                             number = number, repeat = 5))
+    return best / number * 1e9
+
+
+if __name__ == '__main__':
+    for label, cls in [('compiled', Derived), ('walked', Walked)]:
+        bot = cls(None, 0, False)
+        for name in ['onMissionAttempt', 'onVoteComplete']:
+            print('{0:<10s}'.format(label), '{0:<18s}'.format(name), "%6.0f ns/call" % measure(bot, name))
@@ -60,3 +60,57 @@ class Variable(object):
         self.samples += other.samples
         self.minimum = min(self.minimum, other.minimum)
         self.maximum = max(self.maximum, other.maximum)
+
+
+class Latency(object):
+    """Distribution of durations in seconds, stored as a histogram with
+    buckets a quarter of an octave wide starting at one microsecond.  This
+    gives percentiles within ~20% and can be merged cheaply between
+    processes, unlike storing all the samples."""
+
+    BUCKETS = 128
+    RESOLUTION = 4.0
+    MINIMUM = 1e-6
+
+    def __init__(self):
+        self.samples = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.counts = [0] * self.BUCKETS
+
+    def sample(self, value):
+        self.samples += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        if value > self.MINIMUM:
+            b = min(int(math.log(value / self.MINIMUM, 2) * self.RESOLUTION), self.BUCKETS - 1)
+        else:
+            b = 0
+        self.counts[b] += 1
+
+    def mean(self):
+        if self.samples > 0:
+            return self.total / self.samples
+        return 0.0
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket that contains the given percentile."""
+        threshold = fraction * self.samples
+        cumulative = 0
+        for b, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return min(self.MINIMUM * 2.0 ** ((b + 1) / self.RESOLUTION), self.maximum)
+        return self.maximum
+
+    def detail(self):
+        return "{:8d} {:8.3f}ms {:8.3f}ms {:8.3f}ms".format(
+            self.samples, self.mean()*1000.0, self.percentile(0.95)*1000.0, self.maximum*1000.0
+        )
+
+    def __iadd__(self, other):
+        self.samples += other.samples
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return self